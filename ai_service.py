@@ -1,99 +1,325 @@
 """AI service abstraction for resume/cover letter generation."""
+import asyncio
+import atexit
+import functools
+import hashlib
+import json
 import os
+import random
 import re
+import shelve
+import threading
+import time
+import weakref
 from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict, deque
 from typing import Optional
 import anthropic
 import openai
 import requests
 
+from config import Config
 from logger import get_logger
 
 # Get logger for this module
 log = get_logger('ai_service')
 
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to a ~4 chars/token estimate
+    tiktoken = None
 
-def _clean_cover_letter(text: str) -> str:
-    """Remove placeholder fields from cover letter."""
-    # Patterns for common placeholders
-    placeholder_patterns = [
-        r'^\[Current Date\].*$',
-        r'^\[Your Name\].*$',
-        r'^\[Your Address\].*$',
-        r'^\[City,?\s*State,?\s*Zip\].*$',
-        r'^\[Company Address\].*$',
-        r'^\[Company Name\].*$',
-        r'^\[Hiring Manager\].*$',
-        r'^\[Phone\].*$',
-        r'^\[Email\].*$',
-        r'^\[Date\].*$',
-        r'^\d{1,2}/\d{1,2}/\d{2,4}$',  # Date like 12/09/2025
-        r'^[A-Z][a-z]+ \d{1,2},? \d{4}$',  # Date like December 9, 2025
-    ]
-
-    lines = text.split('\n')
-    cleaned_lines = []
-    skip_blank_after_removal = False
-
-    for line in lines:
-        stripped = line.strip()
-
-        # Check if line matches any placeholder pattern
-        is_placeholder = False
-        for pattern in placeholder_patterns:
-            if re.match(pattern, stripped, re.IGNORECASE):
-                is_placeholder = True
-                skip_blank_after_removal = True
-                break
 
-        # Skip empty lines right after removed placeholders (header block)
-        if skip_blank_after_removal and stripped == '':
-            continue
+# Delimited resume blocks in a multi-job batch response
+_RESUME_BLOCK_RE = re.compile(r"<<<RESUME (\d+)>>>(.*?)<<<END RESUME \1>>>", re.DOTALL)
 
-        if not is_placeholder:
-            skip_blank_after_removal = False
-            cleaned_lines.append(line)
 
-    # Remove leading blank lines
-    while cleaned_lines and cleaned_lines[0].strip() == '':
-        cleaned_lines.pop(0)
+@functools.lru_cache(maxsize=8)
+def _get_encoder(model: str):
+    """Get the tiktoken encoder for a model (None if tiktoken is unavailable)."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Encodings are downloaded on first use; don't fail generation over it
+        log.warning(f"tiktoken encoder unavailable for {model}, estimating tokens: {e}")
+        return None
 
-    return '\n'.join(cleaned_lines)
 
+@functools.lru_cache(maxsize=256)
+def _count_tokens(text: str, model: str) -> int:
+    """Count prompt tokens for a model, estimating ~4 chars/token without tiktoken."""
+    encoder = _get_encoder(model)
+    if encoder is None:
+        return len(text) // 4
+    return len(encoder.encode(text))
 
-class AIProvider(ABC):
-    """Abstract base class for AI providers."""
 
-    @abstractmethod
-    def generate_tailored_resume(self, master_resume: str, job_description: str) -> str:
-        """Generate a tailored resume based on job description."""
-        pass
+def clear_tokenizer_cache():
+    """Clear cached tokenizers and token counts."""
+    _get_encoder.cache_clear()
+    _count_tokens.cache_clear()
 
-    @abstractmethod
-    def generate_cover_letter(self, resume: str, job_description: str,
-                               company: str, job_title: str,
-                               hiring_manager: str = None) -> str:
-        """Generate a cover letter for the job."""
-        pass
 
-    def chat(self, messages: list, context: str = None) -> str:
-        """
-        Send a chat message and get a response.
+class RateLimiter:
+    """
+    Proactive requests/tokens-per-minute limiter for provider calls.
 
-        Args:
-            messages: List of message dicts with 'role' and 'content'
-            context: Optional context to include (e.g., job description)
+    Tracks the last minute of requests in a sliding window and waits until both
+    the RPM and TPM budgets have room, instead of firing and backing off on 429s.
+    """
 
-        Returns:
-            AI response text
-        """
-        raise NotImplementedError("Chat not supported by this provider")
+    WINDOW = 60.0
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._events = deque()  # (timestamp, tokens)
+        self._tokens = 0
+        # Plain lock: the limiter is shared by request threads and event loops
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        while self._events and now - self._events[0][0] >= self.WINDOW:
+            self._tokens -= self._events.popleft()[1]
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve capacity for a request, or return the seconds to wait before retrying."""
+        # A single request larger than the TPM budget can only run in an empty window
+        tokens = min(tokens, self.tpm)
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            if len(self._events) < self.rpm and self._tokens + tokens <= self.tpm:
+                self._events.append((now, tokens))
+                self._tokens += tokens
+                return 0.0
+
+            # Wait until enough of the oldest entries age out of the window
+            freed = 0
+            needed = self._tokens + tokens - self.tpm
+            for i, (ts, used) in enumerate(self._events):
+                freed += used
+                if freed >= needed and len(self._events) - (i + 1) < self.rpm:
+                    return max(ts + self.WINDOW - now, 0.01)
+            return self.WINDOW
+
+    async def acquire(self, tokens: int):
+        """Wait until a request of the given size fits within the RPM and TPM limits."""
+        while True:
+            delay = self._reserve(tokens)
+            if not delay:
+                return
+            log.debug(f"Rate limit reached, waiting {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def wait(self, tokens: int):
+        """Blocking variant of acquire, for synchronous calls."""
+        while True:
+            delay = self._reserve(tokens)
+            if not delay:
+                return
+            log.debug(f"Rate limit reached, waiting {delay:.1f}s")
+            time.sleep(delay)
+
+
+_CLAUDE_LIMITER = RateLimiter(rpm=int(os.environ.get('JASS_CLAUDE_RPM', 50)),
+                              tpm=int(os.environ.get('JASS_CLAUDE_TPM', 40_000)))
+
+
+# Retry / circuit breaker settings for transient provider errors
+RETRY_ATTEMPTS = 5
+RETRY_MAX_WAIT = 30  # seconds, cap for the exponential backoff
+BREAKER_THRESHOLD = 5  # consecutive transient failures that open the circuit
+BREAKER_WINDOW = 60  # seconds in which those failures must occur
+BREAKER_COOLDOWN = 30  # seconds to fail fast once the circuit is open
+
+# Errors worth retrying: rate limits, 5xx/overloaded responses, network failures
+_RETRYABLE_ERRORS = (
+    anthropic.RateLimitError, anthropic.InternalServerError, anthropic.OverloadedError,
+    anthropic.APIConnectionError,
+    openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError,
+)
+
+# Circuit breaker state per provider class
+_breakers = {}
+_breaker_lock = threading.Lock()
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the API while a provider's circuit breaker is open."""
+
+
+def _check_breaker(name: str):
+    """Fail fast if the provider's circuit breaker is open."""
+    with _breaker_lock:
+        state = _breakers.get(name)
+        if state and time.monotonic() - state['opened_at'] < BREAKER_COOLDOWN:
+            raise CircuitOpenError(f"{name} is failing repeatedly, not retrying for "
+                                   f"{BREAKER_COOLDOWN}s")
+
+
+def _record_success(name: str):
+    """Reset the provider's failure count after a successful call."""
+    with _breaker_lock:
+        _breakers.pop(name, None)
+
+
+def _retry_delay(name: str, attempt: int, error: Exception) -> Optional[float]:
+    """
+    Record a transient failure and pick the backoff before the next attempt.
 
+    Returns None when the caller should give up (attempts exhausted or the
+    circuit breaker just opened).
+    """
+    now = time.monotonic()
+    with _breaker_lock:
+        state = _breakers.setdefault(name, {'failures': 0, 'first_failure': now, 'opened_at': 0})
+        if now - state['first_failure'] > BREAKER_WINDOW:
+            state.update(failures=0, first_failure=now)
+        state['failures'] += 1
+        if state['failures'] >= BREAKER_THRESHOLD:
+            state['opened_at'] = now
+            log.error(f"{name}: {state['failures']} consecutive failures, "
+                      f"opening circuit for {BREAKER_COOLDOWN}s")
+            return None
+
+    if attempt >= RETRY_ATTEMPTS:
+        return None
+    # Exponential backoff with full jitter
+    delay = random.uniform(0, min(RETRY_MAX_WAIT, 2 ** attempt))
+    log.warning(f"{name} attempt {attempt}/{RETRY_ATTEMPTS} failed ({type(error).__name__}: "
+                f"{error}), retrying in {delay:.1f}s")
+    return delay
+
+
+def _with_retry(func):
+    """Retry a provider method on transient API errors, behind a circuit breaker."""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            name = type(self).__name__
+            for attempt in range(1, RETRY_ATTEMPTS + 1):
+                _check_breaker(name)
+                try:
+                    result = await func(self, *args, **kwargs)
+                except _RETRYABLE_ERRORS as e:
+                    delay = _retry_delay(name, attempt, e)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                else:
+                    _record_success(name)
+                    return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        name = type(self).__name__
+        for attempt in range(1, RETRY_ATTEMPTS + 1):
+            _check_breaker(name)
+            try:
+                result = func(self, *args, **kwargs)
+            except _RETRYABLE_ERRORS as e:
+                delay = _retry_delay(name, attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+            else:
+                _record_success(name)
+                return result
+    return wrapper
 
-class ClaudeProvider(AIProvider):
-    """Claude AI provider using Anthropic API."""
 
-    DEFAULT_RESUME_PROMPT = """You are an expert resume writer. Your task is to tailor a resume for a specific job posting.
+# Token usage accumulated per "provider/model" since startup
+_usage_totals = Counter()
+_usage_lock = threading.Lock()
+
+
+def _record_usage(provider: str, model: str, usage):
+    """
+    Log token usage for one API response and add it to the running totals.
+
+    Handles both Anthropic (input/output/cache_read/cache_creation tokens) and
+    OpenAI (prompt/completion tokens, prompt_tokens_details.cached_tokens) usage.
+    """
+    if usage is None:
+        return
+    if provider == 'claude':
+        counts = {
+            'in': getattr(usage, 'input_tokens', 0) or 0,
+            'cached': getattr(usage, 'cache_read_input_tokens', 0) or 0,
+            'cache_write': getattr(usage, 'cache_creation_input_tokens', 0) or 0,
+            'out': getattr(usage, 'output_tokens', 0) or 0,
+        }
+    else:
+        details = getattr(usage, 'prompt_tokens_details', None)
+        counts = {
+            'in': getattr(usage, 'prompt_tokens', 0) or 0,
+            'cached': getattr(details, 'cached_tokens', 0) or 0,
+            'cache_write': 0,
+            'out': getattr(usage, 'completion_tokens', 0) or 0,
+        }
+
+    log.info(f"Usage: provider={provider} model={model} in={counts['in']} "
+             f"cached={counts['cached']} cache_write={counts['cache_write']} out={counts['out']}")
+    with _usage_lock:
+        _usage_totals[f"{provider}/{model}:calls"] += 1
+        for name, value in counts.items():
+            _usage_totals[f"{provider}/{model}:{name}"] += value
+
+
+def get_usage_totals() -> dict:
+    """Get token usage accumulated since startup, keyed by 'provider/model:counter'."""
+    with _usage_lock:
+        return dict(_usage_totals)
+
+
+@atexit.register
+def _log_usage_totals():
+    """Log accumulated token usage on shutdown."""
+    for name, value in sorted(get_usage_totals().items()):
+        log.info(f"Usage total: {name}={value}")
+
+
+# Placeholder lines to strip from generated cover letters. A match is a whole
+# line (surrounding spaces allowed) with the newline before it, plus any blank
+# lines right after it; [^\S\n] is whitespace within one line. The literal
+# leading newline lets the regex engine skip straight between lines.
+_PLACEHOLDER_RE = re.compile(
+    r'\n[^\S\n]*(?:'
+    r'\[Current Date\].*'
+    r'|\[Your Name\].*'
+    r'|\[Your Address\].*'
+    r'|\[City,?[^\S\n]*State,?[^\S\n]*Zip\].*'
+    r'|\[Company Address\].*'
+    r'|\[Company Name\].*'
+    r'|\[Hiring Manager\].*'
+    r'|\[Phone\].*'
+    r'|\[Email\].*'
+    r'|\[Date\].*'
+    r'|<<<(?:LETTER|END)>>>'  # A delimiter left over when the other one is missing
+    r'|\d{1,2}/\d{1,2}/\d{2,4}'  # Date like 12/09/2025
+    r'|[A-Z][a-z]+ \d{1,2},? \d{4}'  # Date like December 9, 2025
+    r')[^\S\n]*(?=\n|\Z)'
+    r'(?:\n[^\S\n]*(?=\n|\Z))*',
+    re.IGNORECASE
+)
+_LEADING_BLANK_LINES_RE = re.compile(r'\A(?:[^\S\n]*(?:\n|\Z))+')
+
+
+def _clean_cover_letter(text: str) -> str:
+    """Remove placeholder fields from cover letter (fallback when delimiters are missing)."""
+    # The added newline gives the first line one too; it is stripped with the leading blanks
+    return _LEADING_BLANK_LINES_RE.sub('', _PLACEHOLDER_RE.sub('', '\n' + text))
+
+
+# Default instructions for resume / cover letter generation
+_RESUME_INSTRUCTIONS = """You are an expert resume writer. Your task is to tailor a resume for a specific job posting.
 
 INSTRUCTIONS:
 1. Keep the same overall structure and format (Markdown), including all HTML/CSS styling
@@ -105,7 +331,7 @@ INSTRUCTIONS:
 7. Keep all job dates, titles, and companies exactly as they appear
 8. Ensure the resume is ATS-friendly"""
 
-    DEFAULT_COVER_LETTER_PROMPT = """You are an expert cover letter writer. Create a compelling cover letter for a job application.
+_COVER_LETTER_INSTRUCTIONS = """You are an expert cover letter writer. Create a compelling cover letter for a job application.
 
 INSTRUCTIONS:
 1. Open with genuine enthusiasm for the specific role and company
@@ -119,68 +345,458 @@ INSTRUCTIONS:
 9. DO NOT include a header with addresses - start directly with the greeting (e.g., "Dear Hiring Manager,")
 10. Extract the applicant's name from the resume and use it in the signature"""
 
-    def __init__(self, api_key: str, model: str = "claude-sonnet-4-20250514",
-                 resume_prompt: str = None, cover_letter_prompt: str = None):
-        self.client = anthropic.Anthropic(api_key=api_key)
-        self.model = model
-        self.resume_prompt = resume_prompt or self.DEFAULT_RESUME_PROMPT
-        self.cover_letter_prompt = cover_letter_prompt or self.DEFAULT_COVER_LETTER_PROMPT
+# Per-request prompt templates (str.format). Kept as shared constants so every
+# provider sends byte-identical prefixes, which prompt caching depends on.
+_RESUME_JOB_TMPL = """JOB DESCRIPTION:
+{job_description}
 
-    def generate_tailored_resume(self, master_resume: str, job_description: str) -> str:
-        """Generate a tailored resume."""
-        prompt = f"""{self.resume_prompt}
+Return ONLY the tailored resume in Markdown format, no explanations."""
+
+_RESUME_PROMPT_TMPL = """{instructions}
 
 MASTER RESUME:
 {master_resume}
 
-JOB DESCRIPTION:
+""" + _RESUME_JOB_TMPL
+
+_COVER_JOB_TMPL = """JOB DESCRIPTION:
 {job_description}
 
-Return ONLY the tailored resume in Markdown format, no explanations."""
+COMPANY: {company}
+POSITION: {job_title}
+{greeting_line}
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=8192,
-            messages=[{"role": "user", "content": prompt}]
-        )
+{letter_format}"""
 
-        result = response.content[0].text.strip()
-        if not result or len(result) < 200:
-            log.error(f"Claude API returned insufficient resume content ({len(result)} chars)")
-            raise RuntimeError(f"AI returned empty or invalid resume ({len(result)} chars)")
-        return result
+_COVER_PROMPT_TMPL = """{instructions}
+
+RESUME:
+{resume}
+
+""" + _COVER_JOB_TMPL
+
+
+# Output contract for cover letters, so the letter can be cut out without cleanup
+_LETTER_FORMAT = """Respond with exactly:
+<<<LETTER>>>
+{cover letter in Markdown, starting with the greeting}
+<<<END>>>
+No preamble, no address or date header, no explanations."""
+
+# Letter body between the delimiters (a missing end marker means a truncated response).
+# Any whitespace may separate the markers from the letter, including CRLF newlines.
+_LETTER_RE = re.compile(r"<<<LETTER>>>\s*(.*?)\s*(?:<<<END>>>|\Z)", re.DOTALL)
+
+
+# Guards the per-loop async client maps on providers, which request threads share
+_aclients_lock = threading.Lock()
 
+
+async def _close_on_loop_shutdown(clients, loop):
+    """
+    Async generator that closes a loop's async SDK client when the loop shuts down.
+
+    Advanced once to its yield, it is registered with the running loop, and the
+    loop's shutdown_asyncgens() (run by asyncio.run) finishes it on that loop.
+    The entry is then dropped from clients; the generator holds the loop alive
+    until then.
+    """
+    try:
+        yield
+    finally:
+        with _aclients_lock:
+            client, _ = clients.pop(loop)
+        await client.close()
+
+
+def _extract_cover_letter(text: str) -> str:
+    """Extract the cover letter from a delimited response, cleaning it if the model ignored the format."""
+    match = _LETTER_RE.search(text)
+    if match:
+        return match.group(1).strip()
+    return _clean_cover_letter(text)
+
+
+class AIProvider(ABC):
+    """Abstract base class for AI providers."""
+
+    DEFAULT_RESUME_PROMPT = _RESUME_INSTRUCTIONS
+    DEFAULT_COVER_LETTER_PROMPT = _COVER_LETTER_INSTRUCTIONS
+
+    _aclients = None  # event loop -> (client, closer), created on first use
+
+    def _make_aclient(self):
+        """Create the provider's async SDK client."""
+        raise NotImplementedError("Async client not supported by this provider")
+
+    @property
+    def aclient(self):
+        """
+        Async SDK client for the running event loop.
+
+        Providers are cached and shared by request threads, each running its own
+        event loop, and an async HTTP pool is bound to the loop it was first used
+        on, so every loop gets its own client. A client is closed when its loop
+        shuts down (asyncio.run shuts loops down).
+        """
+        loop = asyncio.get_running_loop()
+        with _aclients_lock:
+            if self._aclients is None:
+                self._aclients = weakref.WeakKeyDictionary()
+            entry = self._aclients.get(loop)
+            if entry is None:
+                client = self._make_aclient()
+                closer = _close_on_loop_shutdown(self._aclients, loop)
+                try:
+                    closer.__anext__().send(None)  # run to the yield (no awaits)
+                except StopIteration:
+                    pass
+                # The loop only holds a weak reference to the generator
+                entry = self._aclients[loop] = (client, closer)
+        return entry[0]
+
+    @abstractmethod
+    def generate_tailored_resume(self, master_resume: str, job_description: str) -> str:
+        """Generate a tailored resume based on job description."""
+        pass
+
+    @abstractmethod
     def generate_cover_letter(self, resume: str, job_description: str,
                                company: str, job_title: str,
                                hiring_manager: str = None) -> str:
-        """Generate a cover letter."""
+        """Generate a cover letter for the job."""
+        pass
+
+    def generate_tailored_resumes(self, master_resume: str, job_descriptions: list) -> list:
+        """Generate a tailored resume for each job description (one call per job)."""
+        return [self.generate_tailored_resume(master_resume, jd) for jd in job_descriptions]
+
+    def igenerate_tailored_resume(self, master_resume: str, job_description: str):
+        """
+        Yield the tailored resume as text chunks.
+
+        Providers that support streaming yield deltas as they arrive; the default
+        yields the complete result once.
+        """
+        yield self.generate_tailored_resume(master_resume, job_description)
+
+    def igenerate_cover_letter(self, resume: str, job_description: str,
+                               company: str, job_title: str,
+                               hiring_manager: str = None):
+        """Yield the cover letter as text chunks (see igenerate_tailored_resume)."""
+        yield self.generate_cover_letter(resume, job_description, company,
+                                         job_title, hiring_manager)
+
+    async def agenerate_tailored_resume(self, master_resume: str, job_description: str) -> str:
+        """
+        Async variant of generate_tailored_resume.
+
+        Identical concurrent requests share a single in-flight API call.
+        """
+        key = _cache_key('resume', type(self).__name__, self.model, self.resume_prompt,
+                         master_resume, job_description)
+        return await _acall(key, lambda: self._agenerate_tailored_resume(
+            master_resume, job_description))
+
+    async def agenerate_cover_letter(self, resume: str, job_description: str,
+                                     company: str, job_title: str,
+                                     hiring_manager: str = None) -> str:
+        """Async variant of generate_cover_letter (see agenerate_tailored_resume)."""
+        key = _cache_key('cover_letter', type(self).__name__, self.model,
+                         self.cover_letter_prompt, resume, job_description,
+                         company, job_title, hiring_manager or '')
+        return await _acall(key, lambda: self._agenerate_cover_letter(
+            resume, job_description, company, job_title, hiring_manager))
+
+    async def _agenerate_tailored_resume(self, master_resume: str, job_description: str) -> str:
+        """
+        Generate a tailored resume asynchronously.
+
+        Providers without a native async client run the blocking call in a
+        worker thread so it can still be overlapped with other requests.
+        """
+        return await asyncio.to_thread(self.generate_tailored_resume,
+                                       master_resume, job_description)
+
+    async def _agenerate_cover_letter(self, resume: str, job_description: str,
+                                      company: str, job_title: str,
+                                      hiring_manager: str = None) -> str:
+        """Generate a cover letter asynchronously (see _agenerate_tailored_resume)."""
+        return await asyncio.to_thread(self.generate_cover_letter, resume, job_description,
+                                       company, job_title, hiring_manager)
+
+    # Batch API polling backoff (seconds)
+    BATCH_POLL_INITIAL = 10
+    BATCH_POLL_MAX = 300
+
+    def submit_batch(self, items: list) -> str:
+        """
+        Submit resume tailoring requests to the provider's batch API.
+
+        Args:
+            items: List of dicts with 'id', 'master_resume' and 'job_description'
+
+        Returns:
+            Batch ID to pass to poll_batch()
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batch requests")
+
+    def poll_batch(self, batch_id: str) -> dict:
+        """Wait for a submitted batch to finish and return {item id: tailored resume}."""
+        raise NotImplementedError(f"{type(self).__name__} does not support batch requests")
+
+    def _resume_prompt(self, master_resume: str, job_description: str) -> str:
+        """Build the resume tailoring prompt."""
+        return _RESUME_PROMPT_TMPL.format(instructions=self.resume_prompt,
+                                          master_resume=master_resume,
+                                          job_description=job_description)
+
+    @staticmethod
+    def _greeting_line(hiring_manager: str = None) -> str:
+        """Build the hiring manager / greeting instruction line."""
         if hiring_manager:
-            greeting_line = f"HIRING MANAGER: {hiring_manager} (use 'Dear {hiring_manager},' as the greeting)"
-        else:
-            greeting_line = "HIRING MANAGER: Unknown (use 'Dear Hiring Manager,' as the greeting)"
+            return f"HIRING MANAGER: {hiring_manager} (use 'Dear {hiring_manager},' as the greeting)"
+        return "HIRING MANAGER: Unknown (use 'Dear Hiring Manager,' as the greeting)"
+
+    def _cover_letter_prompt(self, resume: str, job_description: str,
+                             company: str, job_title: str,
+                             hiring_manager: str = None) -> str:
+        """Build the cover letter prompt."""
+        return _COVER_PROMPT_TMPL.format(instructions=self.cover_letter_prompt,
+                                         resume=resume,
+                                         job_description=job_description,
+                                         company=company,
+                                         job_title=job_title,
+                                         greeting_line=self._greeting_line(hiring_manager),
+                                         letter_format=_LETTER_FORMAT)
 
-        prompt = f"""{self.cover_letter_prompt}
+    def chat(self, messages: list, context: str = None) -> str:
+        """
+        Send a chat message and get a response.
 
-RESUME:
-{resume}
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            context: Optional context to include (e.g., job description)
 
-JOB DESCRIPTION:
-{job_description}
+        Returns:
+            AI response text
+        """
+        raise NotImplementedError("Chat not supported by this provider")
 
-COMPANY: {company}
-POSITION: {job_title}
-{greeting_line}
 
-Return ONLY the cover letter in Markdown format, no explanations."""
+class ClaudeProvider(AIProvider):
+    """Claude AI provider using Anthropic API."""
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=2048,
-            messages=[{"role": "user", "content": prompt}]
-        )
+    # Output token cap for multi-job batch requests
+    BATCH_MAX_TOKENS = 64000
 
-        return _clean_cover_letter(response.content[0].text)
+    def __init__(self, api_key: str, model: str = "claude-sonnet-4-20250514",
+                 resume_prompt: str = None, cover_letter_prompt: str = None):
+        self.api_key = api_key
+        self.client = anthropic.Anthropic(api_key=api_key)
+        self.model = model
+        self.resume_prompt = resume_prompt or self.DEFAULT_RESUME_PROMPT
+        self.cover_letter_prompt = cover_letter_prompt or self.DEFAULT_COVER_LETTER_PROMPT
+
+    def _make_aclient(self):
+        """Create the async Anthropic client."""
+        return anthropic.AsyncAnthropic(api_key=self.api_key)
 
+    @staticmethod
+    def _check_resume(result: str) -> str:
+        """Validate the generated resume text."""
+        if not result or len(result) < 200:
+            log.error(f"Claude API returned insufficient resume content ({len(result)} chars)")
+            raise RuntimeError(f"AI returned empty or invalid resume ({len(result)} chars)")
+        return result
+
+    @staticmethod
+    def _cached_blocks(*texts: str) -> list:
+        """Build text blocks (system prompt or message content) marked for Anthropic prompt caching."""
+        return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+                for text in texts]
+
+    def _resume_request(self, master_resume: str, job_description: str) -> dict:
+        """
+        Build messages.create() kwargs for resume generation.
+
+        The instructions and master resume go into cached system blocks so that
+        repeated calls with the same master resume only pay for the job description.
+        """
+        return {
+            "model": self.model,
+            "max_tokens": 8192,
+            "system": self._cached_blocks(self.resume_prompt,
+                                          f"MASTER RESUME:\n{master_resume}"),
+            "messages": [{"role": "user", "content": _RESUME_JOB_TMPL.format(
+                job_description=job_description)}],
+        }
+
+    def _resume_batch_request(self, master_resume: str, job_descriptions: list) -> dict:
+        """Build messages.create() kwargs for tailoring one resume against several jobs."""
+        jobs = "\n\n".join(f"<<<JOB {i}>>>\n{jd}\n<<<END JOB {i}>>>"
+                           for i, jd in enumerate(job_descriptions))
+        return {
+            "model": self.model,
+            "max_tokens": min(8192 * len(job_descriptions), self.BATCH_MAX_TOKENS),
+            "system": self._cached_blocks(self.resume_prompt,
+                                          f"MASTER RESUME:\n{master_resume}"),
+            "messages": [{"role": "user", "content": f"""JOB DESCRIPTIONS:
+{jobs}
+
+Tailor the master resume separately for EACH job above. For job i, return the
+tailored resume in Markdown wrapped exactly as:
+<<<RESUME i>>>
+...resume...
+<<<END RESUME i>>>
+Return ONLY these blocks, in order, no explanations."""}],
+        }
+
+    def _cover_letter_request(self, resume: str, job_description: str,
+                              company: str, job_title: str,
+                              hiring_manager: str = None) -> dict:
+        """Build messages.create() kwargs for cover letter generation (resume is cached)."""
+        return {
+            "model": self.model,
+            "max_tokens": 2048,
+            "system": self._cached_blocks(self.cover_letter_prompt, f"RESUME:\n{resume}"),
+            "messages": [{"role": "user", "content": _COVER_JOB_TMPL.format(
+                job_description=job_description,
+                company=company,
+                job_title=job_title,
+                greeting_line=self._greeting_line(hiring_manager),
+                letter_format=_LETTER_FORMAT)}],
+        }
+
+    @staticmethod
+    def _estimate_tokens(request: dict) -> int:
+        """Rough input token estimate for a messages request (~4 chars/token)."""
+        chars = sum(len(block["text"]) for block in request["system"])
+        for message in request["messages"]:
+            content = message["content"]
+            chars += len(content) if isinstance(content, str) else sum(
+                len(block.get("text", "")) for block in content)
+        return chars // 4
+
+    async def _acreate(self, request: dict):
+        """Send a messages request with the async client, within the Claude rate limits."""
+        await _CLAUDE_LIMITER.acquire(self._estimate_tokens(request))
+        return await self.aclient.messages.create(**request)
+
+    def _stream(self, request: dict):
+        """Stream a messages request, yielding text deltas (within the Claude rate limits)."""
+        _CLAUDE_LIMITER.wait(self._estimate_tokens(request))
+        with self.client.messages.stream(**request) as stream:
+            yield from stream.text_stream
+            _record_usage('claude', self.model, stream.get_final_message().usage)
+
+    def igenerate_tailored_resume(self, master_resume: str, job_description: str):
+        """Stream a tailored resume, yielding text deltas as they arrive."""
+        yield from self._stream(self._resume_request(master_resume, job_description))
+
+    def igenerate_cover_letter(self, resume: str, job_description: str,
+                               company: str, job_title: str,
+                               hiring_manager: str = None):
+        """Stream a cover letter, yielding raw text deltas (including the <<<LETTER>>> delimiters)."""
+        yield from self._stream(self._cover_letter_request(
+            resume, job_description, company, job_title, hiring_manager))
+
+    @_with_retry
+    def generate_tailored_resume(self, master_resume: str, job_description: str) -> str:
+        """Generate a tailored resume."""
+        result = "".join(self.igenerate_tailored_resume(master_resume, job_description))
+        return self._check_resume(result.strip())
+
+    @_with_retry
+    def generate_cover_letter(self, resume: str, job_description: str,
+                               company: str, job_title: str,
+                               hiring_manager: str = None) -> str:
+        """Generate a cover letter."""
+        result = "".join(self.igenerate_cover_letter(resume, job_description, company,
+                                                     job_title, hiring_manager))
+        return _extract_cover_letter(result)
+
+    def generate_tailored_resumes(self, master_resume: str, job_descriptions: list) -> list:
+        """
+        Tailor the master resume for several jobs in a single request.
+
+        The master resume is sent once and the model returns one delimited block
+        per job. Any job whose block is missing or invalid is regenerated with a
+        regular per-job call.
+        """
+        if len(job_descriptions) <= 1:
+            return super().generate_tailored_resumes(master_resume, job_descriptions)
+
+        log.info(f"Generating {len(job_descriptions)} tailored resumes in one request")
+        text = "".join(self._stream(self._resume_batch_request(master_resume, job_descriptions)))
+        blocks = {int(i): body.strip() for i, body in _RESUME_BLOCK_RE.findall(text)}
+
+        results = []
+        for i, jd in enumerate(job_descriptions):
+            block = blocks.get(i, '')
+            if len(block) < 200:
+                log.warning(f"Batch response missing resume {i}, falling back to single request")
+                block = self.generate_tailored_resume(master_resume, jd)
+            results.append(block)
+        return results
+
+    def submit_batch(self, items: list) -> str:
+        """Submit resume tailoring requests to the Anthropic Message Batches API."""
+        batch = self.client.messages.batches.create(requests=[
+            {"custom_id": str(item['id']),
+             "params": self._resume_request(item['master_resume'], item['job_description'])}
+            for item in items
+        ])
+        log.info(f"Submitted Claude batch {batch.id} with {len(items)} requests")
+        return batch.id
+
+    def poll_batch(self, batch_id: str) -> dict:
+        """Wait for a Claude message batch to end and collect the tailored resumes."""
+        delay = self.BATCH_POLL_INITIAL
+        while True:
+            batch = self.client.messages.batches.retrieve(batch_id)
+            if batch.processing_status == "ended":
+                break
+            log.debug(f"Claude batch {batch_id} is {batch.processing_status}, "
+                      f"checking again in {delay}s")
+            time.sleep(delay)
+            delay = min(delay * 2, self.BATCH_POLL_MAX)
+
+        results = {}
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                log.error(f"Claude batch {batch_id} request {entry.custom_id} {entry.result.type}")
+                continue
+            text = entry.result.message.content[0].text.strip()
+            if len(text) < 200:
+                log.error(f"Claude batch {batch_id} request {entry.custom_id} returned "
+                          f"insufficient resume content ({len(text)} chars)")
+                continue
+            results[entry.custom_id] = text
+
+        log.info(f"Claude batch {batch_id} ended: {len(results)} resumes")
+        return results
+
+    @_with_retry
+    async def _agenerate_tailored_resume(self, master_resume: str, job_description: str) -> str:
+        """Generate a tailored resume using the async Anthropic client."""
+        response = await self._acreate(self._resume_request(master_resume, job_description))
+        _record_usage('claude', self.model, response.usage)
+
+        return self._check_resume(response.content[0].text.strip())
+
+    @_with_retry
+    async def _agenerate_cover_letter(self, resume: str, job_description: str,
+                                      company: str, job_title: str,
+                                      hiring_manager: str = None) -> str:
+        """Generate a cover letter using the async Anthropic client."""
+        response = await self._acreate(self._cover_letter_request(
+            resume, job_description, company, job_title, hiring_manager))
+        _record_usage('claude', self.model, response.usage)
+
+        return _extract_cover_letter(response.content[0].text)
+
+    @_with_retry
     def chat(self, messages: list, context: str = None) -> str:
         """Send a chat message and get a response."""
         # Build system message if context provided
@@ -188,12 +804,21 @@ Return ONLY the cover letter in Markdown format, no explanations."""
         if context:
             system_msg += f"\n\nContext (Job Description):\n{context}"
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=4096,
-            system=system_msg,
-            messages=messages
-        )
+        # Cache the context and the conversation so far: the next turn resends
+        # both unchanged, so they are read back as a cached prefix
+        *history, last = messages
+        if isinstance(last.get("content"), str):
+            last = {**last, "content": self._cached_blocks(last["content"])}
+
+        request = {
+            "model": self.model,
+            "max_tokens": 4096,
+            "system": self._cached_blocks(system_msg),
+            "messages": history + [last],
+        }
+        _CLAUDE_LIMITER.wait(self._estimate_tokens(request))
+        response = self.client.messages.create(**request)
+        _record_usage('claude', self.model, response.usage)
 
         return response.content[0].text
 
@@ -210,16 +835,18 @@ class OpenAIProvider(AIProvider):
         'gpt-3.5-turbo': 16385,
     }
 
-    DEFAULT_RESUME_PROMPT = ClaudeProvider.DEFAULT_RESUME_PROMPT
-    DEFAULT_COVER_LETTER_PROMPT = ClaudeProvider.DEFAULT_COVER_LETTER_PROMPT
-
     def __init__(self, api_key: str, model: str = "gpt-4",
                  resume_prompt: str = None, cover_letter_prompt: str = None):
+        self.api_key = api_key
         self.client = openai.OpenAI(api_key=api_key)
         self.model = model
         self.resume_prompt = resume_prompt or self.DEFAULT_RESUME_PROMPT
         self.cover_letter_prompt = cover_letter_prompt or self.DEFAULT_COVER_LETTER_PROMPT
 
+    def _make_aclient(self):
+        """Create the async OpenAI client."""
+        return openai.AsyncOpenAI(api_key=self.api_key)
+
     def _get_max_tokens(self, prompt_tokens: int) -> int:
         """Calculate safe max_tokens based on model limits."""
         limit = self.MODEL_LIMITS.get(self.model, 8192)
@@ -227,20 +854,11 @@ class OpenAIProvider(AIProvider):
         available = limit - prompt_tokens - 100
         return min(available, 4096)  # Cap at 4096 for output
 
-    def generate_tailored_resume(self, master_resume: str, job_description: str) -> str:
-        """Generate a tailored resume."""
-        prompt = f"""{self.resume_prompt}
+    def _resume_request(self, master_resume: str, job_description: str) -> tuple:
+        """Build the resume prompt and its output token budget."""
+        prompt = self._resume_prompt(master_resume, job_description)
 
-MASTER RESUME:
-{master_resume}
-
-JOB DESCRIPTION:
-{job_description}
-
-Return ONLY the tailored resume in Markdown format, no explanations."""
-
-        # Estimate tokens (~4 chars per token)
-        estimated_tokens = len(prompt) // 4
+        estimated_tokens = _count_tokens(prompt, self.model)
         max_tokens = self._get_max_tokens(estimated_tokens)
 
         log.info(f"=== OpenAI Resume Generation ===")
@@ -254,65 +872,180 @@ Return ONLY the tailored resume in Markdown format, no explanations."""
         if estimated_tokens + max_tokens > self.MODEL_LIMITS.get(self.model, 8192):
             log.warning(f"Request may exceed model limit! Consider using gpt-4-turbo")
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            max_tokens=max_tokens,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        return prompt, max_tokens
+
+    def _cover_letter_request(self, resume: str, job_description: str,
+                              company: str, job_title: str,
+                              hiring_manager: str = None) -> tuple:
+        """Build the cover letter prompt and its output token budget."""
+        prompt = self._cover_letter_prompt(resume, job_description, company,
+                                           job_title, hiring_manager)
+
+        estimated_tokens = _count_tokens(prompt, self.model)
+        max_tokens = min(self._get_max_tokens(estimated_tokens), 2048)
+
+        log.info(f"=== OpenAI Cover Letter Generation ===")
+        log.info(f"Model: {self.model}")
+        log.debug(f"Resume length: {len(resume)} chars")
+        log.debug(f"Job desc length: {len(job_description)} chars")
+        log.debug(f"Total prompt: {len(prompt)} chars, ~{estimated_tokens} tokens")
+        log.info(f"Max output tokens: {max_tokens}")
 
-        log.info(f"Response: {response.usage}")
-        result = (response.choices[0].message.content or '').strip()
+        return prompt, max_tokens
+
+    @staticmethod
+    def _check_resume(result: str) -> str:
+        """Validate the generated resume text."""
         if not result or len(result) < 200:
             log.error(f"OpenAI returned insufficient resume content ({len(result)} chars)")
             raise RuntimeError(f"AI returned empty or invalid resume ({len(result)} chars)")
         return result
 
-    def generate_cover_letter(self, resume: str, job_description: str,
-                               company: str, job_title: str,
-                               hiring_manager: str = None) -> str:
-        """Generate a cover letter."""
-        if hiring_manager:
-            greeting_line = f"HIRING MANAGER: {hiring_manager} (use 'Dear {hiring_manager},' as the greeting)"
-        else:
-            greeting_line = "HIRING MANAGER: Unknown (use 'Dear Hiring Manager,' as the greeting)"
+    @staticmethod
+    def _check_cover_letter(result: str) -> str:
+        """Validate and clean the generated cover letter text."""
+        if not result or len(result) < 100:
+            log.error(f"OpenAI returned insufficient cover letter content ({len(result)} chars)")
+            raise RuntimeError(f"AI returned empty or invalid cover letter ({len(result)} chars)")
+        return _extract_cover_letter(result)
 
-        prompt = f"""{self.cover_letter_prompt}
+    def _stream(self, prompt: str, max_tokens: int):
+        """Stream a chat completion, yielding content deltas."""
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        for chunk in stream:
+            if chunk.usage:
+                _record_usage('openai', self.model, chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
-RESUME:
-{resume}
+    def igenerate_tailored_resume(self, master_resume: str, job_description: str):
+        """Stream a tailored resume, yielding text deltas as they arrive."""
+        yield from self._stream(*self._resume_request(master_resume, job_description))
 
-JOB DESCRIPTION:
-{job_description}
+    def igenerate_cover_letter(self, resume: str, job_description: str,
+                               company: str, job_title: str,
+                               hiring_manager: str = None):
+        """Stream a cover letter, yielding raw text deltas (including the <<<LETTER>>> delimiters)."""
+        yield from self._stream(*self._cover_letter_request(
+            resume, job_description, company, job_title, hiring_manager))
 
-COMPANY: {company}
-POSITION: {job_title}
-{greeting_line}
+    @_with_retry
+    def generate_tailored_resume(self, master_resume: str, job_description: str) -> str:
+        """Generate a tailored resume."""
+        result = "".join(self.igenerate_tailored_resume(master_resume, job_description))
+        return self._check_resume(result.strip())
 
-Return ONLY the cover letter in Markdown format, no explanations."""
+    @_with_retry
+    def generate_cover_letter(self, resume: str, job_description: str,
+                               company: str, job_title: str,
+                               hiring_manager: str = None) -> str:
+        """Generate a cover letter."""
+        result = "".join(self.igenerate_cover_letter(resume, job_description, company,
+                                                     job_title, hiring_manager))
+        return self._check_cover_letter(result.strip())
+
+    def submit_batch(self, items: list) -> str:
+        """Upload resume tailoring requests as JSONL and create an OpenAI batch."""
+        lines = []
+        for item in items:
+            prompt, max_tokens = self._resume_request(item['master_resume'],
+                                                      item['job_description'])
+            lines.append(json.dumps({
+                "custom_id": str(item['id']),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "max_tokens": max_tokens,
+                    "messages": [{"role": "user", "content": prompt}],
+                },
+            }))
+
+        batch_file = self.client.files.create(
+            file=("jass-batch.jsonl", "\n".join(lines).encode('utf-8')),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        log.info(f"Submitted OpenAI batch {batch.id} with {len(items)} requests")
+        return batch.id
+
+    def poll_batch(self, batch_id: str) -> dict:
+        """Wait for an OpenAI batch to complete and collect the tailored resumes."""
+        delay = self.BATCH_POLL_INITIAL
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status == "completed":
+                break
+            if batch.status in ("failed", "expired", "cancelled"):
+                raise RuntimeError(f"OpenAI batch {batch_id} {batch.status}")
+            log.debug(f"OpenAI batch {batch_id} is {batch.status}, checking again in {delay}s")
+            time.sleep(delay)
+            delay = min(delay * 2, self.BATCH_POLL_MAX)
+
+        results = {}
+        if batch.output_file_id:
+            output = self.client.files.content(batch.output_file_id).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                if entry.get('error') or response.get('status_code') != 200:
+                    log.error(f"OpenAI batch {batch_id} request {entry['custom_id']} failed: "
+                              f"{entry.get('error') or response.get('status_code')}")
+                    continue
+                text = (response['body']['choices'][0]['message']['content'] or '').strip()
+                if len(text) < 200:
+                    log.error(f"OpenAI batch {batch_id} request {entry['custom_id']} returned "
+                              f"insufficient resume content ({len(text)} chars)")
+                    continue
+                results[entry['custom_id']] = text
+
+        log.info(f"OpenAI batch {batch_id} completed: {len(results)} resumes")
+        return results
+
+    @_with_retry
+    async def _agenerate_tailored_resume(self, master_resume: str, job_description: str) -> str:
+        """Generate a tailored resume using the async OpenAI client."""
+        prompt, max_tokens = self._resume_request(master_resume, job_description)
+
+        response = await self.aclient.chat.completions.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
 
-        estimated_tokens = len(prompt) // 4
-        max_tokens = min(self._get_max_tokens(estimated_tokens), 2048)
+        _record_usage('openai', self.model, response.usage)
+        return self._check_resume((response.choices[0].message.content or '').strip())
 
-        log.info(f"=== OpenAI Cover Letter Generation ===")
-        log.info(f"Model: {self.model}")
-        log.debug(f"Resume length: {len(resume)} chars")
-        log.debug(f"Job desc length: {len(job_description)} chars")
-        log.debug(f"Total prompt: {len(prompt)} chars, ~{estimated_tokens} tokens")
-        log.info(f"Max output tokens: {max_tokens}")
+    @_with_retry
+    async def _agenerate_cover_letter(self, resume: str, job_description: str,
+                                      company: str, job_title: str,
+                                      hiring_manager: str = None) -> str:
+        """Generate a cover letter using the async OpenAI client."""
+        prompt, max_tokens = self._cover_letter_request(resume, job_description, company,
+                                                        job_title, hiring_manager)
 
-        response = self.client.chat.completions.create(
+        response = await self.aclient.chat.completions.create(
             model=self.model,
             max_tokens=max_tokens,
             messages=[{"role": "user", "content": prompt}]
         )
 
-        log.info(f"Response: {response.usage}")
-        result = (response.choices[0].message.content or '').strip()
-        if not result or len(result) < 100:
-            log.error(f"OpenAI returned insufficient cover letter content ({len(result)} chars)")
-            raise RuntimeError(f"AI returned empty or invalid cover letter ({len(result)} chars)")
-        return _clean_cover_letter(result)
+        _record_usage('openai', self.model, response.usage)
+        return self._check_cover_letter((response.choices[0].message.content or '').strip())
 
+    @_with_retry
     def chat(self, messages: list, context: str = None) -> str:
         """Send a chat message and get a response."""
         # Build system message if context provided
@@ -328,6 +1061,7 @@ Return ONLY the cover letter in Markdown format, no explanations."""
             max_tokens=4096,
             messages=all_messages
         )
+        _record_usage('openai', self.model, response.usage)
 
         return response.choices[0].message.content
 
@@ -335,9 +1069,6 @@ Return ONLY the cover letter in Markdown format, no explanations."""
 class OllamaProvider(AIProvider):
     """Ollama provider for local LLM inference."""
 
-    DEFAULT_RESUME_PROMPT = ClaudeProvider.DEFAULT_RESUME_PROMPT
-    DEFAULT_COVER_LETTER_PROMPT = ClaudeProvider.DEFAULT_COVER_LETTER_PROMPT
-
     def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.2",
                  resume_prompt: str = None, cover_letter_prompt: str = None):
         self.base_url = base_url.rstrip('/')
@@ -406,15 +1137,7 @@ class OllamaProvider(AIProvider):
 
     def generate_tailored_resume(self, master_resume: str, job_description: str) -> str:
         """Generate a tailored resume."""
-        prompt = f"""{self.resume_prompt}
-
-MASTER RESUME:
-{master_resume}
-
-JOB DESCRIPTION:
-{job_description}
-
-Return ONLY the tailored resume in Markdown format, no explanations."""
+        prompt = self._resume_prompt(master_resume, job_description)
 
         result = self._generate(prompt, max_tokens=8192).strip()
         if not result or len(result) < 200:
@@ -426,30 +1149,14 @@ Return ONLY the tailored resume in Markdown format, no explanations."""
                                company: str, job_title: str,
                                hiring_manager: str = None) -> str:
         """Generate a cover letter."""
-        if hiring_manager:
-            greeting_line = f"HIRING MANAGER: {hiring_manager} (use 'Dear {hiring_manager},' as the greeting)"
-        else:
-            greeting_line = "HIRING MANAGER: Unknown (use 'Dear Hiring Manager,' as the greeting)"
-
-        prompt = f"""{self.cover_letter_prompt}
-
-RESUME:
-{resume}
-
-JOB DESCRIPTION:
-{job_description}
-
-COMPANY: {company}
-POSITION: {job_title}
-{greeting_line}
-
-Return ONLY the cover letter in Markdown format, no explanations."""
+        prompt = self._cover_letter_prompt(resume, job_description, company,
+                                           job_title, hiring_manager)
 
         result = self._generate(prompt, max_tokens=2048).strip()
         if not result or len(result) < 100:
             log.error(f"Ollama returned insufficient cover letter content ({len(result)} chars)")
             raise RuntimeError(f"AI returned empty or invalid cover letter ({len(result)} chars)")
-        return _clean_cover_letter(result)
+        return _extract_cover_letter(result)
 
     def chat(self, messages: list, context: str = None) -> str:
         """Send a chat message and get a response."""
@@ -480,6 +1187,9 @@ def get_ai_provider(provider: str = None, api_key: str = None,
     """
     Factory function to get an AI provider.
 
+    Provider instances are cached per configuration, so repeated calls reuse the
+    same SDK client and its keep-alive connection pool.
+
     Args:
         provider: 'claude', 'openai', 'claude-cli', or 'ollama'
         api_key: API key (uses env var if not provided, not needed for claude-cli/ollama)
@@ -493,17 +1203,27 @@ def get_ai_provider(provider: str = None, api_key: str = None,
     provider = provider or 'claude'
 
     if provider == 'claude':
-        key = api_key or os.environ.get('ANTHROPIC_API_KEY')
-        if not key:
+        api_key = api_key or os.environ.get('ANTHROPIC_API_KEY')
+        if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not set")
-        return ClaudeProvider(key, model or "claude-sonnet-4-20250514",
+    elif provider == 'openai':
+        api_key = api_key or os.environ.get('OPENAI_API_KEY')
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not set")
+
+    return _provider_cached(provider, api_key, model, resume_prompt, cover_letter_prompt)
+
+
+@functools.lru_cache(maxsize=4)
+def _provider_cached(provider: str, api_key: Optional[str], model: Optional[str],
+                     resume_prompt: Optional[str], cover_letter_prompt: Optional[str]) -> AIProvider:
+    """Create a provider instance (cached by get_ai_provider)."""
+    if provider == 'claude':
+        return ClaudeProvider(api_key, model or "claude-sonnet-4-20250514",
                               resume_prompt, cover_letter_prompt)
 
     elif provider == 'openai':
-        key = api_key or os.environ.get('OPENAI_API_KEY')
-        if not key:
-            raise ValueError("OPENAI_API_KEY not set")
-        return OpenAIProvider(key, model or "gpt-4",
+        return OpenAIProvider(api_key, model or "gpt-4",
                               resume_prompt, cover_letter_prompt)
 
     elif provider == 'claude-cli':
@@ -521,11 +1241,177 @@ def get_ai_provider(provider: str = None, api_key: str = None,
         raise ValueError(f"Unknown provider: {provider}")
 
 
+# Response cache for the convenience functions (enabled with JASS_AI_CACHE=1)
+# shelve has no cross-process locking and _ai_cache_lock only covers this
+# process, so the cache is for a single server process (`python app.py`);
+# don't enable it under a multi-worker server
+AI_CACHE_PATH = os.path.join(Config.DATA_DIR, 'ai_cache')
+AI_CACHE_TTL = 7 * 86400  # 7 days
+AI_CACHE_MEMORY_SIZE = 64
+
+_ai_cache_lock = threading.Lock()
+_ai_memory_cache = OrderedDict()  # key -> response text (in-process LRU)
+_ai_cache_pruned = False  # expired disk entries are deleted on first use
+
+
+def _cache_key(*parts: str) -> str:
+    """Build a content hash key from the generation inputs."""
+    return hashlib.sha256("\x1f".join(p or '' for p in parts).encode()).hexdigest()
+
+
+def _ai_cache_enabled() -> bool:
+    """Check whether the AI response cache is enabled."""
+    return os.environ.get('JASS_AI_CACHE') == '1'
+
+
+def _cached_generate(key: str, generate) -> str:
+    """
+    Return a cached response for key, or call generate() and cache its result.
+
+    Lookup order is the in-process LRU, then the on-disk shelve cache, then the API.
+    """
+    if not _ai_cache_enabled():
+        return generate()
+
+    with _ai_cache_lock:
+        if key in _ai_memory_cache:
+            _ai_memory_cache.move_to_end(key)
+            log.debug(f"AI cache hit (memory): {key[:12]}")
+            return _ai_memory_cache[key]
+
+        os.makedirs(os.path.dirname(AI_CACHE_PATH), exist_ok=True)
+        with shelve.open(AI_CACHE_PATH) as cache:
+            _prune_ai_cache(cache)
+            entry = cache.get(key)
+            if entry and time.time() - entry[0] >= AI_CACHE_TTL:
+                del cache[key]
+                entry = None
+        if entry:
+            log.debug(f"AI cache hit (disk): {key[:12]}")
+            _remember(key, entry[1])
+            return entry[1]
+
+    result = generate()
+
+    with _ai_cache_lock:
+        with shelve.open(AI_CACHE_PATH) as cache:
+            cache[key] = (time.time(), result)
+        _remember(key, result)
+    return result
+
+
+def _prune_ai_cache(cache):
+    """Delete expired entries from the disk cache, once per process (caller holds the lock)."""
+    global _ai_cache_pruned
+    if _ai_cache_pruned:
+        return
+    _ai_cache_pruned = True
+    cutoff = time.time() - AI_CACHE_TTL
+    expired = [key for key, (stored_at, _) in cache.items() if stored_at < cutoff]
+    for key in expired:
+        del cache[key]
+    if expired:
+        log.info(f"Pruned {len(expired)} expired AI cache entries")
+
+
+def _remember(key: str, result: str):
+    """Store a response in the in-process LRU (caller holds the lock)."""
+    _ai_memory_cache[key] = result
+    _ai_memory_cache.move_to_end(key)
+    while len(_ai_memory_cache) > AI_CACHE_MEMORY_SIZE:
+        _ai_memory_cache.popitem(last=False)
+
+
+# Futures for async generations currently in flight, keyed by (event loop,
+# _cache_key()): each asyncio.run() in a worker thread has its own loop, and a
+# future can only be awaited from the loop that created it
+_inflight = {}
+
+
+async def _acall(key: str, coro_factory) -> str:
+    """
+    Run an async generation, coalescing identical concurrent requests.
+
+    If a request with the same key is already in flight, wait for its result
+    instead of making another API call.
+    """
+    loop = asyncio.get_running_loop()
+    fut = _inflight.get((loop, key))
+    if fut is not None:
+        log.debug(f"Joining in-flight request: {key[:12]}")
+        return await asyncio.shield(fut)
+
+    fut = loop.create_future()
+    _inflight[loop, key] = fut
+    try:
+        result = await coro_factory()
+        fut.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        fut.cancel()
+        raise
+    except Exception as e:
+        fut.set_exception(e)
+        fut.exception()  # Waiters re-raise it; don't warn when there are none
+        raise
+    finally:
+        _inflight.pop((loop, key), None)
+
+
 def tailor_resume(master_resume: str, job_description: str,
                   provider: str = None, api_key: str = None) -> str:
     """Convenience function to tailor a resume."""
     ai = get_ai_provider(provider, api_key)
-    return ai.generate_tailored_resume(master_resume, job_description)
+    # Same key as the app's generate_resume_text for the same inputs
+    key = _cache_key('resume', provider or 'claude', ai.model, ai.resume_prompt,
+                     master_resume, job_description)
+    return _cached_generate(key, lambda: ai.generate_tailored_resume(master_resume,
+                                                                     job_description))
+
+
+def tailor_resume_batch(master_resume: str, job_descriptions: list,
+                        provider: str = None, api_key: str = None) -> list:
+    """Convenience function to tailor a resume for several job descriptions."""
+    ai = get_ai_provider(provider, api_key)
+    return ai.generate_tailored_resumes(master_resume, job_descriptions)
+
+
+def tailor_resumes_batch(items: list, mode: str = "batch",
+                         provider: str = None, api_key: str = None) -> dict:
+    """
+    Tailor resumes for many jobs, optionally through the provider's batch API.
+
+    Batch mode is cheaper and not subject to real-time rate limits, but results
+    can take hours, so it is only suited to non-interactive bulk runs.
+
+    Args:
+        items: List of dicts with 'id', 'master_resume' and 'job_description'
+        mode: 'batch' (provider batch API) or 'online' (one request per item)
+        provider: AI provider name
+        api_key: API key
+
+    Returns:
+        Dict mapping str(item id) to tailored resume; failed items are omitted
+    """
+    if mode not in ("batch", "online"):
+        raise ValueError(f"Unknown batch mode: {mode}")
+
+    ai = get_ai_provider(provider, api_key)
+    if mode == "batch":
+        try:
+            return ai.poll_batch(ai.submit_batch(items))
+        except NotImplementedError:
+            log.info(f"{type(ai).__name__} has no batch API, generating online")
+
+    results = {}
+    for item in items:
+        try:
+            results[str(item['id'])] = tailor_resume(item['master_resume'],
+                                                     item['job_description'],
+                                                     provider, api_key)
+        except Exception as e:
+            log.error(f"Failed to tailor resume for {item['id']}: {e}")
+    return results
 
 
 def generate_cover_letter(resume: str, job_description: str,
@@ -533,4 +1419,66 @@ def generate_cover_letter(resume: str, job_description: str,
                           provider: str = None, api_key: str = None) -> str:
     """Convenience function to generate a cover letter."""
     ai = get_ai_provider(provider, api_key)
-    return ai.generate_cover_letter(resume, job_description, company, job_title)
+    # Same key as the app's generate_cover_letter_text (no hiring manager)
+    key = _cache_key('cover_letter', provider or 'claude', ai.model, ai.cover_letter_prompt,
+                     resume, job_description, company, job_title, '')
+    return _cached_generate(key, lambda: ai.generate_cover_letter(resume, job_description,
+                                                                  company, job_title))
+
+
+async def abatch_generate(pairs: list, provider: AIProvider,
+                          max_concurrency: int = 5) -> list:
+    """
+    Generate resumes and cover letters for many jobs concurrently.
+
+    The resume and cover letter for each job are generated in parallel from the
+    master resume (same as the streaming tailor endpoint), and all jobs are
+    overlapped with asyncio.gather. A semaphore bounds the number of in-flight
+    API calls to avoid provider 429s.
+
+    Args:
+        pairs: List of (master_resume, job_description, company, job_title) tuples
+        provider: AIProvider instance to use for every call
+        max_concurrency: Maximum number of concurrent API calls
+
+    Returns:
+        List aligned with pairs; each item is a (resume, cover_letter) tuple,
+        or the exception raised while processing that job
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    async def process_one(master_resume, job_description, company, job_title):
+        return tuple(await asyncio.gather(
+            bounded(provider.agenerate_tailored_resume(master_resume, job_description)),
+            bounded(provider.agenerate_cover_letter(master_resume, job_description,
+                                                    company, job_title)),
+        ))
+
+    coros = [process_one(*pair) for pair in pairs]
+    return await asyncio.gather(*coros, return_exceptions=True)
+
+
+async def process_jobs(jobs: list, provider: str = None, api_key: str = None,
+                       model: str = None, max_concurrency: int = 5) -> list:
+    """
+    Convenience coroutine to tailor documents for a batch of jobs.
+
+    Args:
+        jobs: List of dicts with 'master_resume', 'description', 'company' and 'title'
+        provider: Provider name (see get_ai_provider)
+        api_key: API key (uses env var if not provided)
+        model: Model name
+        max_concurrency: Maximum number of concurrent API calls
+
+    Returns:
+        List of (resume, cover_letter) tuples or exceptions, aligned with jobs
+    """
+    ai = get_ai_provider(provider, api_key, model)
+    pairs = [(j['master_resume'], j['description'], j.get('company', ''), j.get('title', ''))
+             for j in jobs]
+    log.info(f"Processing {len(pairs)} jobs (max concurrency {max_concurrency})")
+    return await abatch_generate(pairs, ai, max_concurrency)
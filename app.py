@@ -1,15 +1,40 @@
 """JASS - Job Application Support System."""
 import os
+import re
 import sys
 import json
+import functools
+import shutil
+import subprocess
+import tempfile
 import threading
+import time
 import queue
-from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, Response
-import markdown
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from bisect import bisect_right
+from operator import itemgetter
+from flask import (Flask, render_template, request, redirect, url_for, flash, jsonify, send_file,
+                   send_from_directory, Response, g, has_request_context)
+from markupsafe import Markup
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy import event
+from sqlalchemy.orm import defer, joinedload, load_only
+import anthropic
+import openai
+import requests
 
 from config import Config
-from models import db, MasterResume, Job, Application, AIConfig, SearchHistory, SearchCache, AppSettings
+from ai_service import get_ai_provider, OllamaProvider, _cache_key, _cached_generate
+from document_gen import (markdown_to_html, extract_applicant_info, generate_pdf,
+                          generate_pdfs, save_application_documents, save_resume_document,
+                          save_cover_letter_document)
+from claude_cli import reset_claude_cache, run_claude
+from greenhouse import GreenhouseClient, html_text_blocks, html_to_text, search_greenhouse
+from job_parser import parse_job_description
+from models import (db, MasterResume, Job, Application, AIConfig, SearchHistory, SearchCache,
+                    AppSettings, upgrade_schema)
 from logger import setup_logging, get_logger
 
 # Parse verbosity from command line (-d, -dd, -ddd, etc.)
@@ -30,13 +55,100 @@ app.config.from_object(Config)
 
 db.init_app(app)
 
+# JASS installation directory (generated documents are also copied to its resume folder)
+JASS_DIR = os.path.dirname(os.path.abspath(__file__))
+
 # Ensure directories exist
 os.makedirs(Config.DATA_DIR, exist_ok=True)
 os.makedirs(Config.APPLICATIONS_DIR, exist_ok=True)
 
+# Persist compiled templates so a restart doesn't re-parse every template.
+# Outside debug mode templates are never re-checked for changes; app.run(debug=True)
+# turns auto-reload back on.
+JINJA_CACHE_DIR = os.path.join(Config.DATA_DIR, '.jinja_cache')
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+app.jinja_env.auto_reload = app.debug
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune each new SQLite connection.
+
+    WAL lets readers run alongside a writer and, with synchronous=NORMAL,
+    commits no longer wait for a full fsync. Also uses a 64 MB page cache and
+    keeps temp tables in memory.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA cache_size=-65536')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.close()
+
+
+# Queries a single request may run before it's logged as a likely N+1
+QUERY_BUDGET = 20
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    """Count SQL statements run while handling the current request."""
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+# Incremented after every commit that wrote to the database, so caches of
+# rendered data can tell when they're stale
+_data_version = 0
+_data_version_lock = threading.Lock()
+_WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def _note_write(conn, cursor, statement, parameters, context, executemany):
+    """Flag connections that have run a write in their current transaction."""
+    if statement.lstrip()[:7].upper().startswith(_WRITE_STATEMENTS):
+        conn.info['wrote'] = True
+
+
+def _bump_data_version(conn):
+    """On commit, bump the data version if the transaction wrote anything."""
+    global _data_version
+    if conn.info.pop('wrote', False):
+        with _data_version_lock:
+            _data_version += 1
+
+
+def _discard_write_flag(conn):
+    """Forget writes from a transaction that was rolled back."""
+    conn.info.pop('wrote', None)
+
+
+# Stored preview HTML was rendered by this Markdown engine; previews stored by
+# an older one are cleared at startup and re-rendered when next viewed
+PREVIEW_RENDERER = 'markdown-it'
+
+
+def _clear_stale_previews():
+    """Clear stored previews rendered by a different Markdown engine."""
+    if AppSettings.get('preview_renderer') == PREVIEW_RENDERER:
+        return
+    MasterResume.query.update({MasterResume.content_html: None})
+    Application.query.update({Application.resume_html: None, Application.cover_letter_html: None})
+    AppSettings.set('preview_renderer', PREVIEW_RENDERER)  # commits
+    log.info(f"Cleared stored previews for the {PREVIEW_RENDERER} renderer")
+
+
 # Create tables
 with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', _set_sqlite_pragmas)
+    event.listen(db.engine, 'before_cursor_execute', _count_query)
+    event.listen(db.engine, 'before_cursor_execute', _note_write)
+    event.listen(db.engine, 'commit', _bump_data_version)
+    event.listen(db.engine, 'rollback', _discard_write_flag)
     db.create_all()
+    upgrade_schema()
+    _clear_stale_previews()
     log.debug("Database tables created/verified")
 
 
@@ -52,25 +164,93 @@ def fromjson_filter(value):
         return []
 
 
+# Job age labels by age in days: (upper bound in days, label builder)
+_AGE_BUCKETS = [
+    (1, lambda days, hours: f"{hours}h ago" if hours > 0 else "Just now"),
+    (2, lambda days, hours: "1 day ago"),
+    (7, lambda days, hours: f"{days} days ago"),
+    (14, lambda days, hours: "1 week ago"),
+    (30, lambda days, hours: f"{days // 7} weeks ago"),
+    (60, lambda days, hours: "1 month ago"),
+]
+_AGE_BOUNDS = [bound for bound, _ in _AGE_BUCKETS]
+
+
+@app.before_request
+def set_request_time():
+    """Take one timestamp per request for handlers and templates to share."""
+    g.now = datetime.utcnow()
+
+
+@app.after_request
+def check_query_budget(response):
+    """In debug mode, warn about requests that ran more queries than QUERY_BUDGET."""
+    count = g.get('query_count', 0)
+    if app.debug and count > QUERY_BUDGET:
+        log.warning(f"{request.method} {request.path} ran {count} queries (budget {QUERY_BUDGET})")
+    return response
+
+
+@app.template_filter('humanize_age')
+def humanize_age_filter(posted_at):
+    """Format how long ago a timestamp was, e.g. '3 days ago'."""
+    if not posted_at:
+        return ''
+    delta = g.now - posted_at
+    days = delta.days
+    i = bisect_right(_AGE_BOUNDS, days)
+    if i == len(_AGE_BUCKETS):
+        return f"{days // 30} months ago"
+    return _AGE_BUCKETS[i][1](days, delta.seconds // 3600)
+
+
 # ============ Dashboard ============
 
+# Seconds a rendered dashboard may be reused while no writes have happened
+DASHBOARD_CACHE_TTL = 30
+
+# (data version, render time, HTML) of the last rendered dashboard content.
+# _data_version only counts commits made by this process: with several server
+# processes (not supported, see docs/installation.md) a dashboard could be up
+# to DASHBOARD_CACHE_TTL seconds stale after another process writes.
+_dashboard_cache = (None, 0.0, '')
+
+
 @app.route('/')
 def dashboard():
     """Dashboard with overview of jobs and applications."""
-    recent_jobs = Job.query.order_by(Job.created_at.desc()).limit(10).all()
-    saved_jobs = Job.query.filter(Job.status.in_(['saved', 'tailoring', 'ready'])).all()
-    applications = Application.query.order_by(Application.created_at.desc()).limit(10).all()
+    global _dashboard_cache
+    version, rendered_at, content = _dashboard_cache
+    if version != _data_version or time.monotonic() - rendered_at > DASHBOARD_CACHE_TTL:
+        version = _data_version
+        content = render_dashboard_content()
+        _dashboard_cache = (version, time.monotonic(), content)
+    return render_template('dashboard.html', content=Markup(content))
+
+
+def render_dashboard_content() -> str:
+    """Query and render the dashboard's stats and lists."""
+    # The dashboard only lists the first few in-progress jobs; read just the
+    # columns it shows, as plain rows
+    saved_jobs = db.session.execute(
+        db.select(Job.id, Job.title, Job.company, Job.status)
+        .where(Job.status.in_(['saved', 'tailoring', 'ready'])).limit(5)).all()
+    applications = Application.query.options(
+        load_only(Application.id, Application.status, Application.tailored_at),
+        joinedload(Application.job).load_only(Job.title, Job.company),
+    ).order_by(Application.created_at.desc()).limit(10).all()
     recent_searches = SearchHistory.query.order_by(SearchHistory.created_at.desc()).limit(5).all()
 
+    # Count jobs per status in a single GROUP BY query
+    by_status = dict(db.session.query(Job.status, db.func.count(Job.id)).group_by(Job.status).all())
     stats = {
-        'total_jobs': Job.query.count(),
-        'saved_jobs': Job.query.filter_by(status='saved').count(),
-        'ready_to_apply': Job.query.filter_by(status='ready').count(),
-        'applied': Job.query.filter_by(status='applied').count(),
+        'total_jobs': sum(by_status.values()),
+        'saved_jobs': by_status.get('saved', 0),
+        'ready_to_apply': by_status.get('ready', 0),
+        'applied': by_status.get('applied', 0),
     }
 
-    return render_template('dashboard.html',
-                           recent_jobs=recent_jobs,
+    return render_template('dashboard_content.html',
                            saved_jobs=saved_jobs,
                            applications=applications,
                            recent_searches=recent_searches,
@@ -86,10 +266,30 @@ def search():
     return render_template('search.html', recent_searches=recent_searches, results=None)
 
 
+def _mark_saved_jobs(jobs: list):
+    """Set is_saved/saved_id on search results, looking up saved jobs in one query."""
+    ids = list({job['greenhouse_id'] for job in jobs})
+    saved = {}
+    # Chunk the IN clause to stay under SQLite's bound parameter limit
+    for i in range(0, len(ids), 500):
+        rows = db.session.query(Job.greenhouse_id, Job.id).filter(
+            Job.greenhouse_id.in_(ids[i:i + 500])).all()
+        saved.update(rows)
+    for job in jobs:
+        job['saved_id'] = saved.get(job['greenhouse_id'])
+        job['is_saved'] = job['saved_id'] is not None
+
+
+def _trim_search_history(keep: int = 10):
+    """Delete all but the most recent search history entries in one statement."""
+    keep_ids = db.session.query(SearchHistory.id).order_by(
+        SearchHistory.created_at.desc()).limit(keep)
+    SearchHistory.query.filter(~SearchHistory.id.in_(keep_ids)).delete(synchronize_session=False)
+
+
 @app.route('/search', methods=['POST'])
 def search_jobs():
     """Execute job search with 24-hour caching."""
-    from greenhouse import search_greenhouse
 
     keywords = request.form.get('keywords', '').strip()
     location = request.form.get('location', '').strip() or None
@@ -141,35 +341,21 @@ def search_jobs():
                     result_count=len(results)
                 )
                 db.session.add(cached)
-            db.session.commit()
 
-            # Clean up old cache entries (older than 24 hours)
-            from datetime import timedelta
+            # Clean up old cache entries (older than 24 hours); committed
+            # together with the search history below
             cutoff = datetime.utcnow() - timedelta(hours=24)
-            old_cache = SearchCache.query.filter(SearchCache.created_at < cutoff).all()
-            for old in old_cache:
-                db.session.delete(old)
-            db.session.commit()
+            SearchCache.query.filter(SearchCache.created_at < cutoff).delete(synchronize_session=False)
 
         except Exception as e:
             log.error(f"Search error: {e}", exc_info=True)
             flash(f'Search error: {str(e)}', 'error')
             return redirect(url_for('search'))
 
-    # Check which jobs are already saved and partition results
-    new_jobs = []
-    saved_jobs = []
-    for job in results:
-        existing = Job.query.filter_by(greenhouse_id=job['greenhouse_id']).first()
-        job['is_saved'] = existing is not None
-        job['saved_id'] = existing.id if existing else None
-        if existing:
-            saved_jobs.append(job)
-        else:
-            new_jobs.append(job)
-
-    # New jobs first, then saved jobs at the end
-    results = new_jobs + saved_jobs
+    # Check which jobs are already saved; new jobs first, then saved jobs at
+    # the end (the sort is stable, so each group keeps its order)
+    _mark_saved_jobs(results)
+    results.sort(key=itemgetter('is_saved'))
 
     # Save search history only for fresh searches (not cached)
     if not from_cache:
@@ -192,12 +378,12 @@ def search_jobs():
                 result_count=len(results)
             )
             db.session.add(history)
-        db.session.commit()
+        db.session.flush()
 
         # Keep only last 10 searches
-        old_searches = SearchHistory.query.order_by(SearchHistory.created_at.desc()).offset(10).all()
-        for old in old_searches:
-            db.session.delete(old)
+        _trim_search_history()
+
+        # One commit for the cache update and history
         db.session.commit()
 
     recent_searches = SearchHistory.query.order_by(SearchHistory.created_at.desc()).limit(10).all()
@@ -215,8 +401,6 @@ def search_jobs():
 @app.route('/search/stream')
 def search_jobs_stream():
     """SSE endpoint: stream search results as each board completes."""
-    from greenhouse import GreenhouseClient
-    from config import Config
 
     keywords = request.args.get('keywords', '').strip()
     location = request.args.get('location', '').strip() or None
@@ -234,7 +418,7 @@ def search_jobs_stream():
         board_list = [b.strip() for b in boards_param.split(',') if b.strip()]
 
     if not board_list:
-        custom_boards = AppSettings.get('greenhouse_boards')
+        custom_boards = cached_setting('greenhouse_boards')
         board_list = custom_boards if custom_boards else Config.DEFAULT_BOARDS
 
     # Filter out commented boards
@@ -251,10 +435,7 @@ def search_jobs_stream():
         def cached_stream():
             results = json.loads(cached.results)
             # Check saved status
-            for job in results:
-                existing = Job.query.filter_by(greenhouse_id=job['greenhouse_id']).first()
-                job['is_saved'] = existing is not None
-                job['saved_id'] = existing.id if existing else None
+            _mark_saved_jobs(results)
             yield f"data: {json.dumps({'type': 'cached', 'jobs': results, 'total': len(results), 'cache_age': cached.created_at.isoformat()})}\n\n"
             yield f"data: {json.dumps({'type': 'done', 'total': len(results), 'from_cache': True})}\n\n"
         return Response(cached_stream(), mimetype='text/event-stream')
@@ -279,10 +460,7 @@ def search_jobs_stream():
                     continue
 
                 # Check saved status for each job
-                for job in matching_jobs:
-                    existing = Job.query.filter_by(greenhouse_id=job['greenhouse_id']).first()
-                    job['is_saved'] = existing is not None
-                    job['saved_id'] = existing.id if existing else None
+                _mark_saved_jobs(matching_jobs)
 
                 all_results.extend(matching_jobs)
 
@@ -291,7 +469,7 @@ def search_jobs_stream():
             # Sort all results for caching
             all_results.sort(key=lambda j: j.get('posted_at') or '', reverse=True)
 
-            # Save to cache
+            # Save to cache and search history in one transaction
             try:
                 cache_results = [{k: v for k, v in job.items() if k not in ('is_saved', 'saved_id')} for job in all_results]
                 existing_cache = SearchCache.query.filter_by(cache_key=cache_key).first()
@@ -309,12 +487,7 @@ def search_jobs_stream():
                         result_count=len(cache_results)
                     )
                     db.session.add(new_cache)
-                db.session.commit()
-            except Exception as e:
-                log.error(f"Error saving search cache: {e}")
 
-            # Save search history
-            try:
                 existing_history = SearchHistory.query.filter_by(keywords=keywords, location=location).first()
                 if existing_history:
                     existing_history.result_count = len(all_results)
@@ -327,14 +500,13 @@ def search_jobs_stream():
                         result_count=len(all_results)
                     )
                     db.session.add(history)
-                db.session.commit()
+                db.session.flush()
 
-                old_searches = SearchHistory.query.order_by(SearchHistory.created_at.desc()).offset(10).all()
-                for old in old_searches:
-                    db.session.delete(old)
+                _trim_search_history()
                 db.session.commit()
             except Exception as e:
-                log.error(f"Error saving search history: {e}")
+                db.session.rollback()
+                log.error(f"Error saving search cache and history: {e}")
 
             yield f"data: {json.dumps({'type': 'done', 'total': len(all_results), 'from_cache': False, 'failed_boards': failed_boards})}\n\n"
 
@@ -346,10 +518,10 @@ def save_job_from_search():
     """Save a job from search results."""
     data = request.get_json()
 
-    # Check if already exists
-    existing = Job.query.filter_by(greenhouse_id=data['greenhouse_id']).first()
-    if existing:
-        return jsonify({'success': True, 'job_id': existing.id, 'message': 'Job already saved'})
+    # Check if already exists (id only, no need to load the description)
+    existing_id = db.session.query(Job.id).filter_by(greenhouse_id=data['greenhouse_id']).scalar()
+    if existing_id:
+        return jsonify({'success': True, 'job_id': existing_id, 'message': 'Job already saved'})
 
     # Create new job
     job = Job(
@@ -360,6 +532,7 @@ def save_job_from_search():
         location=data.get('location', ''),
         url=data.get('url', ''),
         description=data.get('description', ''),
+        description_text=html_to_text(data.get('description', '')),
         department=data.get('department', ''),
         status='saved'
     )
@@ -370,6 +543,62 @@ def save_job_from_search():
     return jsonify({'success': True, 'job_id': job.id})
 
 
+# Fields every job sent to /search/save_bulk must have
+BULK_SAVE_FIELDS = ('greenhouse_id', 'board_token', 'title', 'company')
+
+
+@app.route('/search/save_bulk', methods=['POST'])
+def save_jobs_from_search_bulk():
+    """
+    Save several jobs from search results in one insert.
+
+    The whole request is rejected (400) if any job lacks a required field or
+    a greenhouse_id appears more than once, so nothing is half-saved.
+    """
+    data = request.get_json()
+    jobs = data.get('jobs') or []
+    if not jobs:
+        return jsonify({'success': False, 'error': 'No jobs to save'}), 400
+
+    invalid = [i for i, job in enumerate(jobs)
+               if not isinstance(job, dict) or not all(job.get(field) for field in BULK_SAVE_FIELDS)]
+    if invalid:
+        return jsonify({'success': False, 'error': f"Jobs missing {', '.join(BULK_SAVE_FIELDS)}",
+                        'invalid': invalid}), 400
+    ids = Counter(job['greenhouse_id'] for job in jobs)
+    duplicates = [gh_id for gh_id, count in ids.items() if count > 1]
+    if duplicates:
+        return jsonify({'success': False, 'error': 'Duplicate greenhouse_id',
+                        'duplicates': duplicates}), 400
+
+    _mark_saved_jobs(jobs)
+    rows = []
+    for job in jobs:
+        if not job['is_saved']:
+            rows.append({
+                'greenhouse_id': job['greenhouse_id'],
+                'board_token': job['board_token'],
+                'title': job['title'],
+                'company': job['company'],
+                'location': job.get('location', ''),
+                'url': job.get('url', ''),
+                'description': job.get('description', ''),
+                'description_text': html_to_text(job.get('description', '')),
+                'department': job.get('department', ''),
+                'status': 'saved',
+            })
+    if rows:
+        db.session.bulk_insert_mappings(Job, rows)
+        db.session.commit()
+        _mark_saved_jobs(jobs)
+
+    return jsonify({
+        'success': True,
+        'saved': len(rows),
+        'job_ids': {job['greenhouse_id']: job['saved_id'] for job in jobs},
+    })
+
+
 @app.route('/search/unsave', methods=['POST'])
 def unsave_job_from_search():
     """Remove a saved job from search results (Ctrl+click toggle)."""
@@ -417,14 +646,17 @@ def jobs():
     """List all saved jobs (excludes applied jobs)."""
     status_filter = request.args.get('status', '')
 
-    query = Job.query
+    # Only the columns the list shows, as plain rows (no ORM objects, and no
+    # descriptions loaded)
+    query = db.select(Job.id, Job.title, Job.company, Job.location, Job.url, Job.source,
+                      Job.status, Job.salary_text, Job.is_remote, Job.created_at)
     if status_filter:
-        query = query.filter_by(status=status_filter)
+        query = query.where(Job.status == status_filter)
     else:
         # By default, exclude applied jobs - they are shown in Applications
-        query = query.filter(Job.status != 'applied')
+        query = query.where(Job.status != 'applied')
 
-    all_jobs = query.order_by(Job.created_at.desc()).all()
+    all_jobs = db.session.execute(query.order_by(Job.created_at.desc())).all()
 
     return render_template('jobs.html', jobs=all_jobs, status_filter=status_filter)
 
@@ -438,7 +670,6 @@ def add_job():
 @app.route('/jobs/parse', methods=['POST'])
 def parse_job():
     """Parse job description and return extracted info."""
-    from job_parser import parse_job_description
 
     data = request.get_json()
     description = data.get('description', '')
@@ -477,15 +708,19 @@ def _fuzzy_word_similarity(a: str, b: str) -> float:
     return intersection / union if union else 0.0
 
 
+# Common company suffixes stripped before comparing names
+_COMPANY_SUFFIX_RE = re.compile(
+    r'\b(inc|llc|ltd|corp|co|company|gmbh|plc|sa|ag|group|holdings?|technologies|tech|software|solutions|services|consulting|international|global)\.?\b',
+    re.IGNORECASE)
+
+
 def _company_match(company: str, job_company: str) -> float:
     """Fuzzy company name matching (0.0 to 1.0). Handles Inc/LLC/Corp variations."""
     if not company or not job_company:
         return 0.0
     # Strip common suffixes for comparison
-    import re
-    suffixes = r'\b(inc|llc|ltd|corp|co|company|gmbh|plc|sa|ag|group|holdings?|technologies|tech|software|solutions|services|consulting|international|global)\.?\b'
-    clean_a = re.sub(suffixes, '', company, flags=re.IGNORECASE).strip()
-    clean_b = re.sub(suffixes, '', job_company, flags=re.IGNORECASE).strip()
+    clean_a = _COMPANY_SUFFIX_RE.sub('', company).strip()
+    clean_b = _COMPANY_SUFFIX_RE.sub('', job_company).strip()
     # Exact match after cleaning
     if clean_a == clean_b:
         return 1.0
@@ -529,7 +764,6 @@ def check_duplicate_jobs():
 
     Returns list of potential duplicates with match percentages.
     """
-    from bs4 import BeautifulSoup
 
     data = request.get_json()
     title = data.get('title', '').strip()
@@ -541,16 +775,16 @@ def check_duplicate_jobs():
 
     # Strip HTML from input description if present
     if description and '<' in description:
-        description = BeautifulSoup(description, 'html.parser').get_text()
+        description = html_to_text(description)
 
     duplicates = []
     all_jobs = Job.query.all()
+    backfilled = any(job.description_text is None for job in all_jobs)
 
     for job in all_jobs:
         job_title = job.title or ''
         job_company = job.company or ''
-        job_desc_html = job.description or ''
-        job_desc = BeautifulSoup(job_desc_html, 'html.parser').get_text()
+        job_desc = job_description_text(job)
 
         # Calculate individual similarity scores
         company_sim = _company_match(company, job_company) if company else 0.0
@@ -590,6 +824,10 @@ def check_duplicate_jobs():
                 'match_score': match_score
             })
 
+    # Save description text converted for jobs that didn't have it stored yet
+    if backfilled:
+        db.session.commit()
+
     # Sort by match score (highest first)
     duplicates.sort(key=lambda x: x['match_score'], reverse=True)
 
@@ -599,7 +837,6 @@ def check_duplicate_jobs():
 @app.route('/jobs/add', methods=['POST'])
 def add_job_post():
     """Create a job from manual entry."""
-    from job_parser import parse_job_description
 
     title = request.form.get('title', '').strip()
     company = request.form.get('company', '').strip()
@@ -625,6 +862,7 @@ def add_job_post():
         location=location,
         url=url,
         description=description,
+        description_text=html_to_text(description),
         source=source,
         status='saved',
         salary_min=parsed.get('salary_min'),
@@ -648,70 +886,28 @@ def add_job_post():
 @app.route('/jobs/<int:id>')
 def job_detail(id):
     """View job details."""
-    job = Job.query.get_or_404(id)
+    job = Job.query.options(joinedload(Job.application)).get_or_404(id)
     html_description = job.description or ''  # Already HTML from Greenhouse
 
     # Get master resume for tailoring
-    master_resume = MasterResume.query.filter_by(is_default=True).first()
-    if not master_resume:
-        master_resume = MasterResume.query.first()
+    master_resume = find_master_resume()
 
     # Get AI config
     ai_config = AIConfig.query.filter_by(is_active=True).first()
 
-    # Calculate job age
-    job_age = None
-    if job.posted_at:
-        delta = datetime.utcnow() - job.posted_at
-        days = delta.days
-        if days == 0:
-            hours = delta.seconds // 3600
-            job_age = f"{hours}h ago" if hours > 0 else "Just now"
-        elif days == 1:
-            job_age = "1 day ago"
-        elif days < 7:
-            job_age = f"{days} days ago"
-        elif days < 14:
-            job_age = "1 week ago"
-        elif days < 30:
-            weeks = days // 7
-            job_age = f"{weeks} weeks ago"
-        elif days < 60:
-            job_age = "1 month ago"
-        else:
-            months = days // 30
-            job_age = f"{months} months ago"
-
     # Load existing document content for preview if application exists
     resume_html = ''
     cover_letter_html = ''
     if job.application:
         log.debug(f"Application found for job {id}, resume_md: {job.application.resume_md}")
-        if job.application.resume_md:
-            log.debug(f"Resume path exists check: {os.path.exists(job.application.resume_md)}")
-            if os.path.exists(job.application.resume_md):
-                with open(job.application.resume_md, 'r', encoding='utf-8') as f:
-                    resume_content = f.read()
-                resume_preview = strip_html_for_preview(resume_content)
-                resume_html = markdown.markdown(resume_preview, extensions=['tables', 'nl2br'])
-                log.debug(f"Resume HTML generated: {len(resume_html)} chars")
-
-        log.debug(f"Cover letter_md: {job.application.cover_letter_md}")
-        if job.application.cover_letter_md:
-            log.debug(f"Cover letter path exists check: {os.path.exists(job.application.cover_letter_md)}")
-            if os.path.exists(job.application.cover_letter_md):
-                with open(job.application.cover_letter_md, 'r', encoding='utf-8') as f:
-                    cover_letter_content = f.read()
-                cover_letter_preview = strip_html_for_preview(cover_letter_content)
-                cover_letter_html = markdown.markdown(cover_letter_preview, extensions=['nl2br'])
-                log.debug(f"Cover letter HTML generated: {len(cover_letter_html)} chars")
+        resume_html = document_preview_html(job.application, 'resume')
+        cover_letter_html = document_preview_html(job.application, 'cover_letter')
 
     return render_template('job_detail.html',
                            job=job,
                            html_description=html_description,
                            master_resume=master_resume,
                            ai_config=ai_config,
-                           job_age=job_age,
                            resume_html=resume_html,
                            cover_letter_html=cover_letter_html)
 
@@ -740,7 +936,7 @@ def delete_job(id):
 @app.route('/jobs/<int:id>/applied', methods=['POST'])
 def mark_applied(id):
     """Mark a job as applied."""
-    job = Job.query.get_or_404(id)
+    job = Job.query.options(joinedload(Job.application)).get_or_404(id)
     job.status = 'applied'
     job.applied_at = datetime.utcnow()
     # Also update application if exists
@@ -755,7 +951,7 @@ def mark_applied(id):
 @app.route('/applications/<int:id>/applied', methods=['POST'])
 def mark_application_applied(id):
     """Mark an application as applied."""
-    application = Application.query.get_or_404(id)
+    application = Application.query.options(joinedload(Application.job)).get_or_404(id)
     application.status = 'applied'
     application.applied_at = datetime.utcnow()
     # Also update the job status
@@ -766,20 +962,174 @@ def mark_application_applied(id):
     return redirect(url_for('applications'))
 
 
+# Deletes directories set aside by discard_dir
+_io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='discard')
+
+
+def discard_dir(path: str):
+    """
+    Delete a directory tree without waiting for the delete.
+
+    The directory is first moved aside within its parent (a single rename), so
+    the path is free immediately and new documents can be written there while
+    the old tree is removed in the background. Falls back to deleting in place
+    if the rename fails (e.g. a file is open on Windows).
+    """
+    if not os.path.exists(path):
+        return
+    trash = tempfile.mkdtemp(prefix='.discard-', dir=os.path.dirname(path))
+    try:
+        os.rename(path, os.path.join(trash, os.path.basename(path)))
+    except OSError as e:
+        log.debug(f"Could not move {path} aside ({e}), deleting in place")
+        shutil.rmtree(path)
+    _io_pool.submit(shutil.rmtree, trash, ignore_errors=True)
+
+
+# The application that will be updated comes with the job. Resume tailoring
+# splits the HTML description into paragraphs (resume_description_text), so it's
+# loaded up front; cover letters work from the stored plain text
+# (job_description_text), so the HTML is only loaded for jobs saved before it
+# was stored
+TAILOR_JOB_OPTIONS = (joinedload(Job.application),)
+COVER_LETTER_JOB_OPTIONS = (defer(Job.description), joinedload(Job.application))
+
+
+def find_master_resume():
+    """Get the default master resume, falling back to the first one."""
+    return (MasterResume.query.filter_by(is_default=True).first()
+            or MasterResume.query.first())
+
+
+# Seconds a cached setting may be used before it is re-read, so edits made
+# by another server process are picked up
+SETTING_CACHE_TTL = 60
+
+# key -> (read time, value) for settings read on every generation or search;
+# cleared whenever the settings are saved
+_setting_cache = {}
+
+# Detached copy of the active AIConfig row, safe to share between requests
+AISettings = namedtuple('AISettings', 'provider api_key model_name')
+
+
+def _cached(key: str, load):
+    """Return the cached value for key, calling load() when missing or expired."""
+    cached = _setting_cache.get(key)
+    if cached and time.monotonic() - cached[0] < SETTING_CACHE_TTL:
+        return cached[1]
+    value = load()
+    _setting_cache[key] = (time.monotonic(), value)
+    return value
+
+
+def cached_setting(key: str):
+    """AppSettings.get(key), cached until the settings are saved or the TTL expires."""
+    return _cached(key, lambda: AppSettings.get(key))
+
+
+def cached_ai_config():
+    """The active AI config as AISettings (or None), cached like cached_setting()."""
+    def load():
+        config = AIConfig.query.filter_by(is_active=True).first()
+        return AISettings(config.provider, config.api_key, config.model_name) if config else None
+    return _cached('ai_config', load)
+
+
+def active_ai_config():
+    """
+    Get the active AI config and whether it is usable for tailoring.
+
+    Returns (ai_config, error); error is None when the config can be used.
+    """
+    ai_config = cached_ai_config()
+    if not ai_config:
+        return None, 'AI not configured'
+    # Claude CLI and Ollama don't need an API key, others do
+    if ai_config.provider not in ('claude-cli', 'ollama') and not ai_config.api_key:
+        return ai_config, 'No API key configured'
+    return ai_config, None
+
+
+def tailoring_provider(ai_config):
+    """Get the AI provider for ai_config with the custom tailoring prompts."""
+    return get_ai_provider(ai_config.provider, ai_config.api_key, ai_config.model_name,
+                           cached_setting('resume_prompt'),
+                           cached_setting('cover_letter_prompt'))
+
+
+def generate_resume_text(ai_config, master_resume: str, desc_text: str) -> str:
+    """
+    Generate a tailored resume with the configured provider.
+
+    Goes through the opt-in AI response cache (JASS_AI_CACHE=1), keyed on the
+    provider, model, prompt and inputs.
+    """
+    ai = tailoring_provider(ai_config)
+    key = _cache_key('resume', ai_config.provider, ai.model, ai.resume_prompt,
+                     master_resume, desc_text)
+    return _cached_generate(key, lambda: ai.generate_tailored_resume(master_resume, desc_text))
+
+
+def generate_cover_letter_text(ai_config, resume: str, desc_text: str, company: str,
+                               title: str, hiring_manager: str) -> str:
+    """Generate a cover letter with the configured provider (see generate_resume_text)."""
+    ai = tailoring_provider(ai_config)
+    key = _cache_key('cover_letter', ai_config.provider, ai.model, ai.cover_letter_prompt,
+                     resume, desc_text, company, title, hiring_manager or '')
+    return _cached_generate(key, lambda: ai.generate_cover_letter(
+        resume, desc_text, company, title, hiring_manager))
+
+
+def save_tailored_application(job, paths: dict, tailored_resume: str, cover_letter: str,
+                              ai_config, applicant_info: dict):
+    """
+    Create or update a job's application from freshly generated documents.
+
+    Callers finish all file IO (old folder cleanup, document and PDF writes)
+    first, so SQLite's write lock is only held for the single commit here.
+    """
+    application = job.application
+    if not application:
+        application = Application(job_id=job.id)
+        db.session.add(application)
+
+    application.resume_md = paths.get('resume_md')
+    application.resume_pdf = paths.get('resume_pdf')
+    application.cover_letter_md = paths.get('cover_letter_md')
+    application.cover_letter_pdf = paths.get('cover_letter_pdf')
+    store_document(application, 'resume', tailored_resume)
+    store_document(application, 'cover_letter', cover_letter)
+    application.ai_provider = ai_config.provider
+    application.ai_model = ai_config.model_name
+    application.tailored_at = datetime.utcnow()
+    application.status = 'ready'
+
+    # Pre-fill applicant info from master resume
+    application.first_name = applicant_info.get('first_name', '')
+    application.last_name = applicant_info.get('last_name', '')
+    application.email = applicant_info.get('email', '')
+    application.phone = applicant_info.get('phone', '')
+
+    job.status = 'ready'
+
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return application
+
+
 @app.route('/jobs/<int:id>/tailor', methods=['POST'])
 def tailor_job(id):
     """Generate tailored resume and cover letter for a job."""
-    from ai_service import get_ai_provider
-    from document_gen import save_application_documents, extract_applicant_info, get_application_folder_name
 
-    job = Job.query.get_or_404(id)
+    job = Job.query.options(*TAILOR_JOB_OPTIONS).get_or_404(id)
     log.info(f"Tailoring job {id}: {job.title} at {job.company}")
 
     # Get master resume
-    master_resume = MasterResume.query.filter_by(is_default=True).first()
-    if not master_resume:
-        master_resume = MasterResume.query.first()
-
+    master_resume = find_master_resume()
     if not master_resume:
         log.warning("No master resume found")
         flash('Please create a master resume first', 'error')
@@ -788,75 +1138,43 @@ def tailor_job(id):
     log.debug(f"Using master resume: {master_resume.name}")
 
     # Get AI config
-    ai_config = AIConfig.query.filter_by(is_active=True).first()
-    if not ai_config:
-        log.warning("No AI config found")
-        flash('Please configure AI settings first', 'error')
-        return redirect(url_for('settings'))
-
-    # Claude CLI doesn't need an API key, others do
-    if ai_config.provider not in ('claude-cli', 'ollama') and not ai_config.api_key:
-        log.warning("No API key configured for non-CLI provider")
-        flash('Please configure AI API key first', 'error')
+    ai_config, error = active_ai_config()
+    if error:
+        log.warning(error)
+        if ai_config:
+            flash('Please configure AI API key first', 'error')
+        else:
+            flash('Please configure AI settings first', 'error')
         return redirect(url_for('settings'))
 
     log.debug(f"Using AI provider: {ai_config.provider}/{ai_config.model_name}")
 
     try:
-        # Get custom prompts or use defaults
-        resume_prompt = AppSettings.get('resume_prompt')
-        cover_letter_prompt = AppSettings.get('cover_letter_prompt')
-
-        # Get AI provider with custom prompts
-        ai = get_ai_provider(ai_config.provider, ai_config.api_key, ai_config.model_name,
-                             resume_prompt, cover_letter_prompt)
-
         # Get plain text description
-        from bs4 import BeautifulSoup
-        desc_text = BeautifulSoup(job.description or '', 'html.parser').get_text()
+        desc_text = job_description_text(job)
         log.debug(f"Job description: {len(desc_text)} chars")
 
-        # Prepare application directory for Claude CLI (same naming as save_application_documents)
-        folder_name = get_application_folder_name(job.company, job.id)
-        app_dir = os.path.join(Config.APPLICATIONS_DIR, folder_name)
-
         # Generate tailored resume
         log.info("Generating tailored resume...")
-        if ai_config.provider == 'claude-cli':
-            # Claude CLI needs the app_dir to save/read files
-            tailored_resume = ai.generate_tailored_resume(master_resume.content, desc_text, app_dir)
-        else:
-            tailored_resume = ai.generate_tailored_resume(master_resume.content, desc_text)
+        tailored_resume = generate_resume_text(ai_config, master_resume.content,
+                                               resume_description_text(job))
         log.info(f"Resume generated: {len(tailored_resume)} chars")
 
         # Generate cover letter
         log.info("Generating cover letter...")
-        if ai_config.provider == 'claude-cli':
-            cover_letter = ai.generate_cover_letter(
-                tailored_resume, desc_text, job.company, job.title, app_dir,
-                job.hiring_manager
-            )
-        else:
-            cover_letter = ai.generate_cover_letter(
-                tailored_resume, desc_text, job.company, job.title,
-                job.hiring_manager
-            )
+        cover_letter = generate_cover_letter_text(
+            ai_config, tailored_resume, desc_text, job.company, job.title,
+            job.hiring_manager)
         log.info(f"Cover letter generated: {len(cover_letter)} chars")
 
         # Extract applicant info from master resume
         applicant_info = extract_applicant_info(master_resume.content)
         log.debug(f"Extracted applicant info: {applicant_info}")
 
-        # Get Jass directory for resume copy
-        jass_dir = os.path.dirname(os.path.abspath(__file__))
-
         # Delete old application folder if it exists (for regeneration)
         application = job.application
         if application and application.resume_md:
-            old_dir = os.path.dirname(application.resume_md)
-            if os.path.exists(old_dir):
-                import shutil
-                shutil.rmtree(old_dir)
+            discard_dir(os.path.dirname(application.resume_md))
 
         # Save documents with company name and applicant info
         paths = save_application_documents(
@@ -864,33 +1182,11 @@ def tailor_job(id):
             company=job.company,
             first_name=applicant_info.get('first_name'),
             last_name=applicant_info.get('last_name'),
-            script_dir=jass_dir
+            script_dir=JASS_DIR
         )
 
-        # Create or update application
-        application = job.application
-        if not application:
-            application = Application(job_id=job.id)
-            db.session.add(application)
-
-        application.resume_md = paths.get('resume_md')
-        application.resume_pdf = paths.get('resume_pdf')
-        application.cover_letter_md = paths.get('cover_letter_md')
-        application.cover_letter_pdf = paths.get('cover_letter_pdf')
-        application.ai_provider = ai_config.provider
-        application.ai_model = ai_config.model_name
-        application.tailored_at = datetime.utcnow()
-        application.status = 'ready'
-
-        # Pre-fill applicant info from master resume
-        application.first_name = applicant_info.get('first_name', '')
-        application.last_name = applicant_info.get('last_name', '')
-        application.email = applicant_info.get('email', '')
-        application.phone = applicant_info.get('phone', '')
-
-        job.status = 'ready'
-
-        db.session.commit()
+        application = save_tailored_application(job, paths, tailored_resume, cover_letter,
+                                                ai_config, applicant_info)
 
         log.info(f"Documents saved successfully for application {application.id}")
         flash('Resume and cover letter generated successfully!', 'success')
@@ -918,67 +1214,54 @@ def tailor_job_stream(id):
        - Cover letter generation thread (AI markdown + PDF)
     2. Stream progress events from both threads
     3. Wait for both and combine results
+
+    The whole flow runs in a background stream (see background_stream_response),
+    so it finishes and saves even if the client disconnects, and reopening the
+    stream while it runs follows the same generation.
     """
-    from document_gen import extract_applicant_info, get_application_folder_name
 
     def generate():
         # SSE generators run outside request context, so we need app context
         with app.app_context():
-            job = db.session.get(Job, id)
+            job = db.session.get(Job, id, options=TAILOR_JOB_OPTIONS)
             if not job:
-                yield f"data: {json.dumps({'error': 'Job not found'})}\n\n"
+                yield sse_message('error', 'Job not found')
                 return
 
             log.info(f"Tailoring job {id}: {job.title} at {job.company}")
 
             # Get master resume
-            master_resume = MasterResume.query.filter_by(is_default=True).first()
-            if not master_resume:
-                master_resume = MasterResume.query.first()
-
+            master_resume = find_master_resume()
             if not master_resume:
-                yield f"data: {json.dumps({'error': 'No master resume found'})}\n\n"
+                yield sse_message('error', 'No master resume found')
                 return
 
             # Get AI config
-            ai_config = AIConfig.query.filter_by(is_active=True).first()
-            if not ai_config:
-                yield f"data: {json.dumps({'error': 'AI not configured'})}\n\n"
-                return
-
-            if ai_config.provider not in ('claude-cli', 'ollama') and not ai_config.api_key:
-                yield f"data: {json.dumps({'error': 'No API key configured'})}\n\n"
+            ai_config, error = active_ai_config()
+            if error:
+                yield sse_message('error', error)
                 return
 
             try:
-                yield f"data: {json.dumps({'status': 'Starting parallel generation...'})}\n\n"
+                yield sse_message('status', 'Starting parallel generation...')
 
-                # Get plain text description
-                from bs4 import BeautifulSoup
-                desc_text = BeautifulSoup(job.description or '', 'html.parser').get_text()
-
-                # Prepare application directory
-                folder_name = get_application_folder_name(job.company, job.id)
-                app_dir = os.path.join(Config.APPLICATIONS_DIR, folder_name)
+                # Get plain text description (without company boilerplate for the resume)
+                desc_text = job_description_text(job)
+                resume_desc_text = resume_description_text(job)
 
                 # Extract applicant info
                 applicant_info = extract_applicant_info(master_resume.content)
                 applicant_info['company'] = job.company
-                jass_dir = os.path.dirname(os.path.abspath(__file__))
 
                 # Delete old application folder if exists
                 application = job.application
                 if application and application.resume_md:
-                    old_dir = os.path.dirname(application.resume_md)
-                    if os.path.exists(old_dir):
-                        import shutil
-                        shutil.rmtree(old_dir)
+                    discard_dir(os.path.dirname(application.resume_md))
 
-                # Create queues for thread communication
+                # Create queues for thread communication (one shared event queue)
                 resume_result_queue = queue.Queue()
-                resume_event_queue = queue.Queue()
                 cl_result_queue = queue.Queue()
-                cl_event_queue = queue.Queue()
+                event_queue = queue.Queue()
 
                 # Capture values needed by threads (avoid accessing ORM objects across threads)
                 master_resume_content = master_resume.content
@@ -987,56 +1270,19 @@ def tailor_job_stream(id):
                 job_hiring_manager = job.hiring_manager
                 job_id = job.id
 
-                # Start BOTH threads in parallel
-                resume_thread = threading.Thread(
-                    target=generate_resume_threaded,
-                    args=(job_id, master_resume_content, desc_text, ai_config,
-                          app_dir, applicant_info, jass_dir, resume_result_queue, resume_event_queue),
-                    daemon=True,
-                    name=f"Resume-{job_id}"
-                )
-
-                cl_thread = threading.Thread(
-                    target=generate_cover_letter_threaded,
-                    args=(job_id, master_resume_content, desc_text, job_company, job_title,
-                          job_hiring_manager, ai_config, app_dir, applicant_info,
-                          jass_dir, cl_result_queue, cl_event_queue),
-                    daemon=True,
-                    name=f"CoverLetter-{job_id}"
-                )
-
-                resume_thread.start()
-                cl_thread.start()
-                log.info("Started parallel threads for resume and cover letter generation")
-
-                # Stream events from both threads
-                import time
-                both_finished = False
-                while not both_finished:
-                    # Drain events from both queues
-                    got_event = False
-                    for eq in (resume_event_queue, cl_event_queue):
-                        try:
-                            event = eq.get_nowait()
-                            yield f"data: {json.dumps(event)}\n\n"
-                            got_event = True
-                        except queue.Empty:
-                            pass
-
-                    if not got_event:
-                        if not resume_thread.is_alive() and not cl_thread.is_alive():
-                            # Drain any remaining events
-                            for eq in (resume_event_queue, cl_event_queue):
-                                while not eq.empty():
-                                    event = eq.get_nowait()
-                                    yield f"data: {json.dumps(event)}\n\n"
-                            both_finished = True
-                        else:
-                            time.sleep(0.3)
-
-                # Wait for both threads to complete
-                resume_thread.join(timeout=5)
-                cl_thread.join(timeout=5)
+                # Run BOTH threads in parallel and stream their events
+                log.info("Starting parallel threads for resume and cover letter generation")
+                yield from stream_worker_events(event_queue, [
+                    (generate_resume_threaded,
+                     (job_id, master_resume_content, resume_desc_text, ai_config,
+                      applicant_info, JASS_DIR, resume_result_queue, event_queue),
+                     f"Resume-{job_id}"),
+                    (generate_cover_letter_threaded,
+                     (job_id, master_resume_content, desc_text, job_company, job_title,
+                      job_hiring_manager, ai_config, applicant_info,
+                      JASS_DIR, cl_result_queue, event_queue),
+                     f"CoverLetter-{job_id}"),
+                ])
 
                 # Get results from both threads
                 try:
@@ -1064,25 +1310,9 @@ def tailor_job_stream(id):
                 log.info("Both threads completed successfully, saving to database")
 
                 # Update database with results
-                if not application:
-                    application = Application(job_id=job.id)
-                    db.session.add(application)
-
-                application.resume_md = all_paths.get('resume_md')
-                application.resume_pdf = all_paths.get('resume_pdf')
-                application.cover_letter_md = all_paths.get('cover_letter_md')
-                application.cover_letter_pdf = all_paths.get('cover_letter_pdf')
-                application.ai_provider = ai_config.provider
-                application.ai_model = ai_config.model_name
-                application.tailored_at = datetime.utcnow()
-                application.status = 'ready'
-                application.first_name = applicant_info.get('first_name', '')
-                application.last_name = applicant_info.get('last_name', '')
-                application.email = applicant_info.get('email', '')
-                application.phone = applicant_info.get('phone', '')
-
-                job.status = 'ready'
-                db.session.commit()
+                application = save_tailored_application(
+                    job, all_paths, resume_result['tailored_resume'], cl_result['cover_letter'],
+                    ai_config, applicant_info)
 
                 log.info(f"Documents saved successfully for application {application.id}")
                 redirect_url = f"/applications/{application.id}"
@@ -1092,11 +1322,140 @@ def tailor_job_stream(id):
                 log.error(f"Error generating documents: {e}", exc_info=True)
                 yield f"data: {json.dumps({'error': str(e)})}\n\n"
 
-    return Response(generate(), mimetype='text/event-stream')
+    return background_stream_response(('tailor', id), generate)
+
+
+# Seconds without progress before an SSE keep-alive comment is sent
+SSE_KEEPALIVE = 15
+
+
+@functools.lru_cache(maxsize=None)
+def sse_message(kind: str, message: str) -> str:
+    """Format a fixed {kind: message} event as an SSE frame, serializing it only once."""
+    return f"data: {json.dumps({kind: message})}\n\n"
+
+# Put on the event queue by stream_worker_events when a worker returns
+_WORKER_DONE = object()
+
+
+def stream_worker_events(event_queue: queue.Queue, workers: list):
+    """
+    Run workers in threads and relay their progress events as SSE lines.
+
+    Blocks on the shared event queue instead of polling, so events are sent as
+    soon as they're queued and the calling thread sleeps in between. Returns
+    once every worker has finished; results are left on the workers' own queues.
+
+    Args:
+        event_queue: Queue the workers put progress event dicts on
+        workers: List of (target, args, thread_name) tuples
+    """
+    def run(target, args):
+        try:
+            target(*args)
+        finally:
+            event_queue.put(_WORKER_DONE)
+
+    for target, args, name in workers:
+        threading.Thread(target=run, args=(target, args), daemon=True, name=name).start()
+
+    remaining = len(workers)
+    while remaining:
+        try:
+            event = event_queue.get(timeout=SSE_KEEPALIVE)
+        except queue.Empty:
+            # Comment line; EventSource ignores it but proxies see traffic
+            yield ": keep-alive\n\n"
+            continue
+        if event is _WORKER_DONE:
+            remaining -= 1
+        else:
+            yield f"data: {json.dumps(event)}\n\n"
+
+
+class BackgroundStream:
+    """
+    An SSE generator run to completion in a background thread.
+
+    The lines it yields are kept, so clients can follow along from the start
+    while it runs, and a client disconnecting doesn't abandon the work.
+    """
+
+    def __init__(self, key, make_stream):
+        self.key = key
+        self.lines = []
+        self.finished = False
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, args=(make_stream,), daemon=True,
+                         name=f"Stream-{key[0]}-{key[1]}").start()
+
+    def _publish(self, line: str):
+        with self._cond:
+            self.lines.append(line)
+            self._cond.notify_all()
+
+    def _run(self, make_stream):
+        try:
+            for line in make_stream():
+                # Followers send their own keep-alives
+                if not line.startswith(':'):
+                    self._publish(line)
+        except Exception as e:
+            log.error(f"Background stream {self.key} failed: {e}", exc_info=True)
+            self._publish(f"data: {json.dumps({'error': str(e)})}\n\n")
+        finally:
+            with _background_streams_lock:
+                if _background_streams.get(self.key) is self:
+                    del _background_streams[self.key]
+            with self._cond:
+                self.finished = True
+                self._cond.notify_all()
+
+    def follow(self):
+        """Yield every line so far, then new ones as they come, until finished."""
+        sent = 0
+        while True:
+            with self._cond:
+                if sent == len(self.lines) and not self.finished:
+                    self._cond.wait(SSE_KEEPALIVE)
+                new_lines = self.lines[sent:]
+                finished = self.finished
+            if new_lines:
+                sent += len(new_lines)
+                yield from new_lines
+            elif finished:
+                return
+            else:
+                yield ": keep-alive\n\n"
+
+
+# Running background streams by (kind, job id). Kept in this process, so the
+# app must run as a single server process (see docs/installation.md)
+_background_streams = {}
+_background_streams_lock = threading.Lock()
+
+
+def background_stream_response(key, make_stream) -> Response:
+    """
+    Stream a long-running SSE generator that keeps running if the client goes.
+
+    If a stream for the same key is still running, the client follows that one
+    instead of starting the work again.
+
+    Args:
+        key: (kind, job id) tuple identifying the work
+        make_stream: Function returning the SSE generator
+    """
+    with _background_streams_lock:
+        stream = _background_streams.get(key)
+        if stream is None:
+            stream = BackgroundStream(key, make_stream)
+            _background_streams[key] = stream
+    return Response(stream.follow(), mimetype='text/event-stream')
 
 
 def generate_resume_threaded(job_id, master_resume_content, desc_text, ai_config,
-                             app_dir, applicant_info, jass_dir, result_queue, event_queue):
+                             applicant_info, jass_dir, result_queue, event_queue):
     """
     Generate resume in a separate thread.
 
@@ -1105,40 +1464,22 @@ def generate_resume_threaded(job_id, master_resume_content, desc_text, ai_config
         master_resume_content: Master resume markdown content
         desc_text: Plain text job description
         ai_config: AIConfig object with provider, api_key, model_name
-        app_dir: Application directory path
         applicant_info: Dict with first_name, last_name, email, phone
         jass_dir: JASS installation directory
         result_queue: Queue to put results (dict with paths or error)
         event_queue: Queue to put SSE events for progress updates
     """
-    from ai_service import get_ai_provider
-    from document_gen import save_resume_document
 
     try:
         # Create app context for database access
         with app.app_context():
             event_queue.put({'status': 'Tailoring...', 'source': 'resume'})
 
-            # Get custom prompts
-            resume_prompt = AppSettings.get('resume_prompt')
-            cover_letter_prompt = AppSettings.get('cover_letter_prompt')
-
-            # Initialize AI provider
-            ai = get_ai_provider(ai_config.provider, ai_config.api_key, ai_config.model_name,
-                                resume_prompt, cover_letter_prompt)
-
             # Generate tailored resume
-            if ai_config.provider == 'claude-cli':
-                tailored_resume = ai.generate_tailored_resume(master_resume_content, desc_text, app_dir)
-            else:
-                tailored_resume = ai.generate_tailored_resume(master_resume_content, desc_text)
+            tailored_resume = generate_resume_text(ai_config, master_resume_content, desc_text)
 
             event_queue.put({'status': 'Generating PDF...', 'source': 'resume'})
 
-            # Save resume document (MD and PDF)
-            from document_gen import get_application_folder_name
-            from config import Config
-
             paths = save_resume_document(
                 job_id, tailored_resume, Config.APPLICATIONS_DIR,
                 company=applicant_info.get('company'),
@@ -1167,7 +1508,7 @@ def generate_resume_threaded(job_id, master_resume_content, desc_text, ai_config
 
 
 def generate_cover_letter_threaded(job_id, resume_content, desc_text, company, title,
-                                   hiring_manager, ai_config, app_dir, applicant_info,
+                                   hiring_manager, ai_config, applicant_info,
                                    jass_dir, result_queue, event_queue):
     """
     Generate cover letter in a separate thread.
@@ -1180,42 +1521,22 @@ def generate_cover_letter_threaded(job_id, resume_content, desc_text, company, t
         title: Job title
         hiring_manager: Hiring manager name (optional)
         ai_config: AIConfig object with provider, api_key, model_name
-        app_dir: Application directory path
         applicant_info: Dict with first_name, last_name
         jass_dir: JASS installation directory
         result_queue: Queue to put results (dict with paths or error)
         event_queue: Queue to put SSE events for progress updates
     """
-    from ai_service import get_ai_provider
-    from document_gen import save_cover_letter_document
 
     try:
         with app.app_context():
             event_queue.put({'status': 'Generating...', 'source': 'cover_letter'})
 
-            # Get custom prompts
-            resume_prompt = AppSettings.get('resume_prompt')
-            cover_letter_prompt = AppSettings.get('cover_letter_prompt')
-
-            # Initialize AI provider
-            ai = get_ai_provider(ai_config.provider, ai_config.api_key, ai_config.model_name,
-                                resume_prompt, cover_letter_prompt)
-
             # Generate cover letter
-            if ai_config.provider == 'claude-cli':
-                cover_letter = ai.generate_cover_letter(
-                    resume_content, desc_text, company, title, app_dir, hiring_manager
-                )
-            else:
-                cover_letter = ai.generate_cover_letter(
-                    resume_content, desc_text, company, title, hiring_manager
-                )
+            cover_letter = generate_cover_letter_text(
+                ai_config, resume_content, desc_text, company, title, hiring_manager)
 
             event_queue.put({'status': 'Generating PDF...', 'source': 'cover_letter'})
 
-            # Save cover letter document (MD and PDF)
-            from config import Config
-
             paths = save_cover_letter_document(
                 job_id, cover_letter, Config.APPLICATIONS_DIR,
                 company=company,
@@ -1227,7 +1548,8 @@ def generate_cover_letter_threaded(job_id, resume_content, desc_text, company, t
             # Put successful result in queue
             result_queue.put({
                 'success': True,
-                'paths': paths
+                'paths': paths,
+                'cover_letter': cover_letter
             })
 
             event_queue.put({'status': 'Done', 'source': 'cover_letter'})
@@ -1245,83 +1567,49 @@ def generate_cover_letter_threaded(job_id, resume_content, desc_text, company, t
 @app.route('/jobs/<int:id>/tailor-resume-stream')
 def tailor_resume_stream(id):
     """Generate tailored resume only with SSE progress updates using threading."""
-    from document_gen import extract_applicant_info, get_application_folder_name
-    import time
 
     def generate():
         with app.app_context():
-            job = Job.query.get(id)
+            job = db.session.get(Job, id, options=TAILOR_JOB_OPTIONS)
             if not job:
-                yield f"data: {json.dumps({'error': 'Job not found'})}\n\n"
+                yield sse_message('error', 'Job not found')
                 return
 
             log.info(f"Tailoring resume for job {id}: {job.title} at {job.company}")
 
             # Get master resume
-            master_resume = MasterResume.query.filter_by(is_default=True).first()
-            if not master_resume:
-                master_resume = MasterResume.query.first()
-
+            master_resume = find_master_resume()
             if not master_resume:
-                yield f"data: {json.dumps({'error': 'No master resume found'})}\n\n"
+                yield sse_message('error', 'No master resume found')
                 return
 
             # Get AI config
-            ai_config = AIConfig.query.filter_by(is_active=True).first()
-            if not ai_config:
-                yield f"data: {json.dumps({'error': 'AI not configured'})}\n\n"
-                return
-
-            if ai_config.provider not in ('claude-cli', 'ollama') and not ai_config.api_key:
-                yield f"data: {json.dumps({'error': 'No API key configured'})}\n\n"
+            ai_config, error = active_ai_config()
+            if error:
+                yield sse_message('error', error)
                 return
 
             try:
-                yield f"data: {json.dumps({'status': 'Initializing...'})}\n\n"
+                yield sse_message('status', 'Initializing...')
 
-                # Get plain text description
-                from bs4 import BeautifulSoup
-                desc_text = BeautifulSoup(job.description or '', 'html.parser').get_text()
-
-                # Prepare application directory
-                folder_name = get_application_folder_name(job.company, job.id)
-                app_dir = os.path.join(Config.APPLICATIONS_DIR, folder_name)
+                # Get plain text description, without company boilerplate
+                desc_text = resume_description_text(job)
 
                 # Extract applicant info for file naming
                 applicant_info = extract_applicant_info(master_resume.content)
                 applicant_info['company'] = job.company
-                jass_dir = os.path.dirname(os.path.abspath(__file__))
 
                 # Create queues for thread communication
                 result_queue = queue.Queue()
                 event_queue = queue.Queue()
 
-                # Start resume generation thread
-                resume_thread = threading.Thread(
-                    target=generate_resume_threaded,
-                    args=(job.id, master_resume.content, desc_text, ai_config,
-                          app_dir, applicant_info, jass_dir, result_queue, event_queue),
-                    daemon=True
-                )
-                resume_thread.start()
-
-                # Stream events from the thread
-                thread_finished = False
-                while not thread_finished:
-                    try:
-                        # Check for events from thread (non-blocking)
-                        event = event_queue.get(timeout=0.1)
-                        yield f"data: {json.dumps(event)}\n\n"
-                    except queue.Empty:
-                        # No events yet, check if thread is still alive
-                        if not resume_thread.is_alive():
-                            thread_finished = True
-                        else:
-                            # Send heartbeat to keep connection alive
-                            time.sleep(0.5)
-
-                # Wait for thread to complete and get result
-                resume_thread.join(timeout=5)
+                # Run resume generation thread and stream its events
+                yield from stream_worker_events(event_queue, [
+                    (generate_resume_threaded,
+                     (job.id, master_resume.content, desc_text, ai_config,
+                      applicant_info, JASS_DIR, result_queue, event_queue),
+                     f"Resume-{job.id}"),
+                ])
 
                 # Get the result
                 try:
@@ -1336,124 +1624,97 @@ def tailor_resume_stream(id):
 
                 paths = result['paths']
 
-                # Update database with results (thread-safe)
-                with app.app_context():
-                    job = Job.query.get(id)
-                    application = job.application
-                    if not application:
-                        application = Application(job_id=job.id)
-                        db.session.add(application)
-
-                    application.resume_md = paths.get('resume_md')
-                    application.resume_pdf = paths.get('resume_pdf')
-                    application.ai_provider = ai_config.provider
-                    application.ai_model = ai_config.model_name
-                    application.tailored_at = datetime.utcnow()
-                    application.status = 'ready'
-                    application.first_name = applicant_info.get('first_name', '')
-                    application.last_name = applicant_info.get('last_name', '')
-                    application.email = applicant_info.get('email', '')
-                    application.phone = applicant_info.get('phone', '')
-
-                    job.status = 'ready'
-                    db.session.commit()
-
-                    log.info(f"Resume saved successfully for application {application.id}")
-                    redirect_url = f"/applications/{application.id}"
-                    yield f"data: {json.dumps({'status': 'Complete!', 'redirect': redirect_url})}\n\n"
+                # Update database with results (in this stream's session, so a
+                # description text backfilled above is saved too)
+                application = job.application
+                if not application:
+                    application = Application(job_id=job.id)
+                    db.session.add(application)
+
+                application.resume_md = paths.get('resume_md')
+                application.resume_pdf = paths.get('resume_pdf')
+                store_document(application, 'resume', result['tailored_resume'])
+                application.ai_provider = ai_config.provider
+                application.ai_model = ai_config.model_name
+                application.tailored_at = datetime.utcnow()
+                application.status = 'ready'
+                application.first_name = applicant_info.get('first_name', '')
+                application.last_name = applicant_info.get('last_name', '')
+                application.email = applicant_info.get('email', '')
+                application.phone = applicant_info.get('phone', '')
+
+                job.status = 'ready'
+                db.session.commit()
+
+                log.info(f"Resume saved successfully for application {application.id}")
+                redirect_url = f"/applications/{application.id}"
+                yield f"data: {json.dumps({'status': 'Complete!', 'redirect': redirect_url})}\n\n"
 
             except Exception as e:
                 log.error(f"Error generating resume: {e}", exc_info=True)
                 yield f"data: {json.dumps({'error': str(e)})}\n\n"
 
-    return Response(generate(), mimetype='text/event-stream')
+    return background_stream_response(('resume', id), generate)
 
 
 @app.route('/jobs/<int:id>/tailor-cover-letter-stream')
 def tailor_cover_letter_stream(id):
     """Generate cover letter only with SSE progress updates (requires existing resume)."""
-    from ai_service import get_ai_provider
-    from document_gen import save_cover_letter_document, get_application_folder_name
 
     def generate():
         with app.app_context():
-            job = Job.query.get(id)
+            job = db.session.get(Job, id, options=COVER_LETTER_JOB_OPTIONS)
             if not job:
-                yield f"data: {json.dumps({'error': 'Job not found'})}\n\n"
+                yield sse_message('error', 'Job not found')
                 return
 
             # Check for existing resume
             application = job.application
             if not application or not application.resume_md:
-                yield f"data: {json.dumps({'error': 'Generate a resume first'})}\n\n"
+                yield sse_message('error', 'Generate a resume first')
                 return
 
-            # Read the existing tailored resume
-            if not os.path.exists(application.resume_md):
-                yield f"data: {json.dumps({'error': 'Resume file not found. Please regenerate the resume.'})}\n\n"
+            # Get the existing tailored resume
+            tailored_resume = document_markdown(application, 'resume')
+            if not tailored_resume:
+                yield sse_message('error', 'Resume file not found. Please regenerate the resume.')
                 return
 
-            with open(application.resume_md, 'r', encoding='utf-8') as f:
-                tailored_resume = f.read()
-
             log.info(f"Generating cover letter for job {id}: {job.title} at {job.company}")
 
             # Get AI config
-            ai_config = AIConfig.query.filter_by(is_active=True).first()
-            if not ai_config:
-                yield f"data: {json.dumps({'error': 'AI not configured'})}\n\n"
-                return
-
-            if ai_config.provider not in ('claude-cli', 'ollama') and not ai_config.api_key:
-                yield f"data: {json.dumps({'error': 'No API key configured'})}\n\n"
+            ai_config, error = active_ai_config()
+            if error:
+                yield sse_message('error', error)
                 return
 
             try:
-                yield f"data: {json.dumps({'status': 'Initializing AI...'})}\n\n"
-
-                # Get custom prompts
-                resume_prompt = AppSettings.get('resume_prompt')
-                cover_letter_prompt = AppSettings.get('cover_letter_prompt')
-
-                ai = get_ai_provider(ai_config.provider, ai_config.api_key, ai_config.model_name,
-                                     resume_prompt, cover_letter_prompt)
+                yield sse_message('status', 'Initializing AI...')
 
                 # Get plain text description
-                from bs4 import BeautifulSoup
-                desc_text = BeautifulSoup(job.description or '', 'html.parser').get_text()
-
-                # Prepare application directory
-                folder_name = get_application_folder_name(job.company, job.id)
-                app_dir = os.path.join(Config.APPLICATIONS_DIR, folder_name)
+                desc_text = job_description_text(job)
 
                 # Generate cover letter
-                yield f"data: {json.dumps({'status': 'Generating cover letter...'})}\n\n"
-                if ai_config.provider == 'claude-cli':
-                    cover_letter = ai.generate_cover_letter(
-                        tailored_resume, desc_text, job.company, job.title, app_dir,
-                        job.hiring_manager
-                    )
-                else:
-                    cover_letter = ai.generate_cover_letter(
-                        tailored_resume, desc_text, job.company, job.title,
-                        job.hiring_manager
-                    )
+                yield sse_message('status', 'Generating cover letter...')
+                cover_letter = generate_cover_letter_text(
+                    ai_config, tailored_resume, desc_text, job.company, job.title,
+                    job.hiring_manager)
 
                 # Save cover letter document
-                yield f"data: {json.dumps({'status': 'Generating PDF...'})}\n\n"
-                jass_dir = os.path.dirname(os.path.abspath(__file__))
+                yield sse_message('status', 'Generating PDF...')
 
                 paths = save_cover_letter_document(
                     job.id, cover_letter, Config.APPLICATIONS_DIR,
                     company=job.company,
                     first_name=application.first_name,
                     last_name=application.last_name,
-                    script_dir=jass_dir
+                    script_dir=JASS_DIR
                 )
 
                 # Update application
                 application.cover_letter_md = paths.get('cover_letter_md')
                 application.cover_letter_pdf = paths.get('cover_letter_pdf')
+                store_document(application, 'cover_letter', cover_letter)
                 application.ai_provider = ai_config.provider
                 application.ai_model = ai_config.model_name
                 application.tailored_at = datetime.utcnow()
@@ -1468,7 +1729,7 @@ def tailor_cover_letter_stream(id):
                 log.error(f"Error generating cover letter: {e}", exc_info=True)
                 yield f"data: {json.dumps({'error': str(e)})}\n\n"
 
-    return Response(generate(), mimetype='text/event-stream')
+    return background_stream_response(('cover_letter', id), generate)
 
 
 # ============ Applications ============
@@ -1476,43 +1737,175 @@ def tailor_cover_letter_stream(id):
 @app.route('/applications')
 def applications():
     """List all applications."""
-    all_applications = Application.query.order_by(Application.created_at.desc()).all()
+    # Skip the stored documents and job descriptions, which the list doesn't show
+    all_applications = Application.query.options(
+        load_only(Application.id, Application.status, Application.created_at,
+                  Application.tailored_at, Application.applied_at,
+                  Application.resume_pdf, Application.cover_letter_pdf),
+        joinedload(Application.job).load_only(Job.title, Job.company, Job.url),
+    ).order_by(Application.created_at.desc()).all()
     return render_template('applications.html', applications=all_applications)
 
 
+_STYLE_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
 def strip_html_for_preview(content: str) -> str:
     """Strip HTML tags and style blocks from markdown for clean preview."""
-    import re
-    # Remove <style>...</style> blocks
-    content = re.sub(r'<style[^>]*>.*?</style>', '', content, flags=re.DOTALL | re.IGNORECASE)
-    # Remove all HTML tags
-    content = re.sub(r'<[^>]+>', '', content)
+    # Remove <style>...</style> blocks, then all HTML tags
+    return _TAG_RE.sub('', _STYLE_RE.sub('', content))
+
+
+def render_document_html(content: str) -> str:
+    """Render resume/cover letter markdown as preview HTML."""
+    return markdown_to_html(strip_html_for_preview(content))
+
+
+def job_description_text(job) -> str:
+    """
+    Get a job's description as plain text.
+
+    Uses the copy stored on the job; for jobs saved before it was stored, the
+    text is converted once and saved with the caller's next commit.
+    """
+    if job.description_text is None:
+        job.description_text = html_to_text(job.description)
+    return job.description_text
+
+
+# Resume prompts leave out company boilerplate: paragraphs in the about-us,
+# benefits and EEO/legal parts of a posting that also appear in most of the
+# company's other recent postings. Shared requirements (stack, seniority,
+# location) are role text and always kept.
+BOILERPLATE_MIN_JOBS = 3  # other postings needed before anything is left out
+BOILERPLATE_SAMPLE = 20  # most recent postings compared against
+BOILERPLATE_MIN_CHARS = 40  # headings and short bullets are always kept
+BOILERPLATE_MARKER = '[STANDARD COMPANY BOILERPLATE]'
+# Section headings that start boilerplate ("About Acme", but not "About the role")
+_BOILERPLATE_HEADING_RE = re.compile(
+    r'^(?:about (?!(?:the |this )?(?:role|job|position|opportunity|team|you)\b)|who we are|'
+    r'why (?:join|work)|life at|our (?:mission|story|values|culture|commitment)|'
+    r'benefits|perks|what we offer|compensation|pay\b|salary|equal|eeo|diversity|'
+    r'accommodation|privacy)', re.IGNORECASE)
+# Legal paragraphs that are boilerplate under any heading
+_BOILERPLATE_TEXT_RE = re.compile(
+    r'equal (?:employment )?opportunity|without regard to|reasonable accommodation|'
+    r'e-verify|privacy (?:policy|notice)', re.IGNORECASE)
+_BOILERPLATE_RUN_RE = re.compile(
+    rf'{re.escape(BOILERPLATE_MARKER)}(?:\s*{re.escape(BOILERPLATE_MARKER)})+')
+
+
+def resume_description_text(job) -> str:
+    """
+    Get a job's description for the resume prompt, without company boilerplate.
+
+    Paragraphs in boilerplate sections (about us, benefits, EEO) that are
+    shared with at least half of the company's other saved postings are
+    replaced with BOILERPLATE_MARKER, so the model reads (and is billed for)
+    only the role-specific text. Cover letters keep the full description,
+    since they draw on what the company says about itself.
+    """
+    desc_text = job_description_text(job)
+    if not job.company:
+        return desc_text
+    others = db.session.execute(
+        db.select(Job.description_text)
+        .where(Job.company == job.company, Job.id != job.id,
+               Job.description_text.is_not(None))
+        .order_by(Job.id.desc()).limit(BOILERPLATE_SAMPLE)).scalars().all()
+    if len(others) < BOILERPLATE_MIN_JOBS:
+        return desc_text
+
+    needed = max(BOILERPLATE_MIN_JOBS, (len(others) + 1) // 2)
+    boilerplate = [block for heading, block in html_text_blocks(job.description)
+                   if len(block) >= BOILERPLATE_MIN_CHARS
+                   and (_BOILERPLATE_HEADING_RE.match(heading)
+                        or _BOILERPLATE_TEXT_RE.search(block))
+                   and sum(block in text for text in others) >= needed]
+    if not boilerplate:
+        return desc_text
+    # Blocks come in document order, so a list item goes before its paragraphs
+    stripped = desc_text
+    for block in boilerplate:
+        stripped = stripped.replace(block, BOILERPLATE_MARKER)
+    stripped = _BOILERPLATE_RUN_RE.sub(BOILERPLATE_MARKER, stripped)
+    log.debug(f"Left out {len(boilerplate)} boilerplate block(s) for job {job.id}: "
+              f"{len(desc_text)} -> {len(stripped)} chars")
+    return stripped
+
+
+def store_document(application, doc_type: str, content: str):
+    """Store a resume/cover letter's markdown and preview HTML on the application."""
+    setattr(application, f'{doc_type}_md_text', content)
+    setattr(application, f'{doc_type}_html', render_document_html(content))
+
+
+def document_markdown(application, doc_type: str) -> str:
+    """
+    Get the markdown for an application's resume or cover letter.
+
+    Reads the copy stored on the application; applications created before it
+    was stored are loaded from the markdown file once and saved.
+    """
+    content = getattr(application, f'{doc_type}_md_text')
+    if content is None:
+        md_path = getattr(application, f'{doc_type}_md')
+        if not md_path:
+            return ''
+        try:
+            with open(md_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return ''
+        store_document(application, doc_type, content)
+        db.session.commit()
     return content
 
 
-@app.route('/applications/<int:id>')
-def application_detail(id):
-    """View application details with tailored documents."""
-    application = Application.query.get_or_404(id)
+def document_preview_html(application, doc_type: str) -> str:
+    """
+    Get the preview HTML for an application's resume or cover letter.
 
-    # Read document contents
-    resume_content = ''
-    cover_letter_content = ''
+    Previews that aren't stored (or were cleared by _clear_stale_previews) are
+    rendered once and saved.
+    """
+    if getattr(application, f'{doc_type}_html') is None:
+        stored = getattr(application, f'{doc_type}_md_text') is not None
+        content = document_markdown(application, doc_type)
+        if stored and content:
+            setattr(application, f'{doc_type}_html', render_document_html(content))
+            db.session.commit()
+    return getattr(application, f'{doc_type}_html') or ''
 
-    if application.resume_md and os.path.exists(application.resume_md):
-        with open(application.resume_md, 'r', encoding='utf-8') as f:
-            resume_content = f.read()
 
-    if application.cover_letter_md and os.path.exists(application.cover_letter_md):
-        with open(application.cover_letter_md, 'r', encoding='utf-8') as f:
-            cover_letter_content = f.read()
+def master_resume_html(resume) -> str:
+    """
+    Get the preview HTML for a master resume.
+
+    The HTML is stored when the resume is saved; resumes saved before it was
+    stored are rendered once and saved.
+    """
+    if resume.content_html is None:
+        resume.content_html = markdown_to_html(resume.content)
+        db.session.commit()
+    return resume.content_html
 
-    # Strip HTML for clean preview, convert to HTML
-    resume_preview = strip_html_for_preview(resume_content)
-    cover_letter_preview = strip_html_for_preview(cover_letter_content)
 
-    resume_html = markdown.markdown(resume_preview, extensions=['tables', 'nl2br'])
-    cover_letter_html = markdown.markdown(cover_letter_preview, extensions=['nl2br'])
+@app.route('/applications/<int:id>')
+def application_detail(id):
+    """View application details with tailored documents."""
+    # The page shows the job's description HTML but never its plain-text copy
+    application = Application.query.options(
+        joinedload(Application.job).load_only(Job.title, Job.company, Job.location,
+                                              Job.description, Job.url),
+    ).get_or_404(id)
+
+    # Document markdown and preview HTML are stored when documents are written
+    resume_content = document_markdown(application, 'resume')
+    cover_letter_content = document_markdown(application, 'cover_letter')
+    resume_html = document_preview_html(application, 'resume')
+    cover_letter_html = document_preview_html(application, 'cover_letter')
 
     return render_template('application_detail.html',
                            application=application,
@@ -1525,9 +1918,6 @@ def application_detail(id):
 @app.route('/applications/<int:id>/chat', methods=['POST'])
 def application_chat(id):
     """AI chat for application assistance."""
-    from ai_service import get_ai_provider
-    from claude_cli import ClaudeCLIProvider
-    from bs4 import BeautifulSoup
 
     application = Application.query.get_or_404(id)
 
@@ -1539,29 +1929,24 @@ def application_chat(id):
         return jsonify({'error': 'No messages provided'}), 400
 
     # Get AI config
-    ai_config = AIConfig.query.filter_by(is_active=True).first()
+    ai_config = cached_ai_config()
     if not ai_config:
         return jsonify({'error': 'AI not configured'}), 400
 
     try:
-        # Get AI provider
-        if ai_config.provider == 'claude-cli':
-            ai = ClaudeCLIProvider(ai_config.model_name)
-        else:
-            ai = get_ai_provider(ai_config.provider, ai_config.api_key, ai_config.model_name)
+        # Get AI provider (cached per configuration, like the tailoring routes)
+        ai = get_ai_provider(ai_config.provider, ai_config.api_key, ai_config.model_name)
 
         # Build context with job description and resume
         context_parts = []
 
         if include_job_desc and application.job.description:
-            raw_desc = application.job.description
-            job_desc_text = BeautifulSoup(raw_desc, 'html.parser').get_text()
+            job_desc_text = job_description_text(application.job)
             context_parts.append(f"JOB DESCRIPTION:\n{job_desc_text}")
 
         # Always include resume if available
-        if application.resume_md and os.path.exists(application.resume_md):
-            with open(application.resume_md, 'r', encoding='utf-8') as f:
-                resume_content = f.read()
+        resume_content = document_markdown(application, 'resume')
+        if resume_content:
             # Strip HTML from resume for cleaner context
             resume_text = strip_html_for_preview(resume_content)
             context_parts.append(f"CANDIDATE RESUME:\n{resume_text}")
@@ -1581,10 +1966,22 @@ def application_chat(id):
         return jsonify({'error': str(e)}), 500
 
 
+def _document_changed(application, doc_type: str, content: str) -> bool:
+    """Check whether submitted markdown differs from the stored document (or its PDF is missing)."""
+    pdf_path = getattr(application, f'{doc_type}_pdf')
+    if not pdf_path or not os.path.exists(pdf_path):
+        return True
+    # Textareas submit CRLF line endings, so compare normalized text
+    stored = document_markdown(application, doc_type)
+    if content.replace('\r\n', '\n') == stored.replace('\r\n', '\n'):
+        log.debug(f"{doc_type} unchanged, skipping write and PDF generation")
+        return False
+    return True
+
+
 @app.route('/applications/<int:id>/update', methods=['POST'])
 def update_application(id):
     """Update application documents (resume and cover letter)."""
-    from document_gen import generate_pdf
 
     log.info(f"Updating application {id}")
     application = Application.query.get_or_404(id)
@@ -1595,62 +1992,69 @@ def update_application(id):
     cover_letter_md = request.form.get('cover_letter_md', '')
     log.debug(f"Resume MD length: {len(resume_md)}, Cover letter MD length: {len(cover_letter_md)}")
 
-    # Save updated markdown
-    if resume_md and application.resume_md:
-        log.debug(f"Saving resume to {application.resume_md}")
-        with open(application.resume_md, 'w', encoding='utf-8') as f:
-            f.write(resume_md)
-        # Regenerate PDF (or generate if missing)
-        if application.resume_pdf:
-            log.debug(f"Regenerating resume PDF: {application.resume_pdf}")
-            generate_pdf(resume_md, application.resume_pdf, 'resume')
-            log.debug("Resume PDF generated")
-        else:
-            # PDF path missing - generate it
-            pdf_path = application.resume_md.replace('.md', '.pdf')
-            log.debug(f"Generating missing resume PDF: {pdf_path}")
-            generate_pdf(resume_md, pdf_path, 'resume')
-            application.resume_pdf = pdf_path
-            log.debug("Resume PDF generated and path saved")
-
-    if cover_letter_md and application.cover_letter_md:
-        log.debug(f"Saving cover letter to {application.cover_letter_md}")
-        with open(application.cover_letter_md, 'w', encoding='utf-8') as f:
-            f.write(cover_letter_md)
+    # Save updated markdown, skipping documents whose content is unchanged
+    pdf_jobs = []
+    for doc_type, content in (('resume', resume_md), ('cover_letter', cover_letter_md)):
+        md_path = getattr(application, f'{doc_type}_md')
+        if not content or not md_path or not _document_changed(application, doc_type, content):
+            continue
+        log.debug(f"Saving {doc_type} to {md_path}")
+        with open(md_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        store_document(application, doc_type, content)
         # Regenerate PDF (or generate if missing)
-        if application.cover_letter_pdf:
-            log.debug(f"Regenerating cover letter PDF: {application.cover_letter_pdf}")
-            generate_pdf(cover_letter_md, application.cover_letter_pdf, 'cover_letter')
-            log.debug("Cover letter PDF generated")
-        else:
-            # PDF path missing - generate it
-            pdf_path = application.cover_letter_md.replace('.md', '.pdf')
-            log.debug(f"Generating missing cover letter PDF: {pdf_path}")
-            generate_pdf(cover_letter_md, pdf_path, 'cover_letter')
-            application.cover_letter_pdf = pdf_path
-            log.debug("Cover letter PDF generated and path saved")
-
-    application.status = 'ready'
-    db.session.commit()
+        pdf_path = getattr(application, f'{doc_type}_pdf')
+        if not pdf_path:
+            pdf_path = md_path.replace('.md', '.pdf')
+            log.debug(f"Generating missing {doc_type} PDF: {pdf_path}")
+            setattr(application, f'{doc_type}_pdf', pdf_path)
+        pdf_jobs.append((content, pdf_path, doc_type))
+
+    # Both PDFs render in parallel, in the PDF worker processes
+    if pdf_jobs:
+        generate_pdfs(pdf_jobs)
+        log.debug(f"Generated {len(pdf_jobs)} PDF(s)")
+
+    # A save without edits has nothing to write
+    if pdf_jobs or application.status != 'ready':
+        application.status = 'ready'
+        db.session.commit()
     log.info(f"Application {id} updated successfully")
 
     flash('Documents updated', 'success')
     return redirect(url_for('application_detail', id=id))
 
 
+def _send_document(path: str):
+    """
+    Send an application document as a download.
+
+    The response carries an ETag/Last-Modified from the file and a short private
+    max-age, so repeat downloads of an unchanged file get a 304. The body is a
+    file wrapper, so servers with wsgi.file_wrapper use sendfile(2), and with
+    USE_X_SENDFILE the front-end server reads the file itself.
+    """
+    directory, filename = os.path.split(path)
+    response = send_from_directory(directory, filename, as_attachment=True,
+                                   conditional=True, max_age=300)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+
 @app.route('/applications/<int:id>/download/<doc_type>')
 def download_document(id, doc_type):
     """Download a document (resume or cover letter)."""
     application = Application.query.get_or_404(id)
 
     if doc_type == 'resume_pdf' and application.resume_pdf:
-        return send_file(application.resume_pdf, as_attachment=True)
+        return _send_document(application.resume_pdf)
     elif doc_type == 'resume_md' and application.resume_md:
-        return send_file(application.resume_md, as_attachment=True)
+        return _send_document(application.resume_md)
     elif doc_type == 'cover_letter_pdf' and application.cover_letter_pdf:
-        return send_file(application.cover_letter_pdf, as_attachment=True)
+        return _send_document(application.cover_letter_pdf)
     elif doc_type == 'cover_letter_md' and application.cover_letter_md:
-        return send_file(application.cover_letter_md, as_attachment=True)
+        return _send_document(application.cover_letter_md)
     else:
         flash('Document not found', 'error')
         return redirect(url_for('application_detail', id=id))
@@ -1659,20 +2063,18 @@ def download_document(id, doc_type):
 @app.route('/applications/<int:id>/delete', methods=['POST'])
 def delete_application(id):
     """Delete an application and its files."""
-    import shutil
 
-    application = Application.query.get_or_404(id)
-    job = application.job
+    # Only the file paths are needed, not the stored documents or the job
+    application = Application.query.options(
+        load_only(Application.job_id, Application.resume_md)).get_or_404(id)
 
     # Delete files directory
     if application.resume_md:
-        app_dir = os.path.dirname(application.resume_md)
-        if os.path.exists(app_dir):
-            shutil.rmtree(app_dir)
+        discard_dir(os.path.dirname(application.resume_md))
 
     # Reset job status
-    if job:
-        job.status = 'saved'
+    Job.query.filter_by(id=application.job_id).update({Job.status: 'saved'},
+                                                      synchronize_session=False)
 
     # Delete application record
     db.session.delete(application)
@@ -1688,13 +2090,12 @@ def delete_application(id):
 def resume():
     """Master resume editor."""
     resumes = MasterResume.query.all()
-    current = MasterResume.query.filter_by(is_default=True).first()
-    if not current and resumes:
-        current = resumes[0]
+    # The default resume is already in the list, falling back to the first one
+    current = next((r for r in resumes if r.is_default), resumes[0] if resumes else None)
 
     html_preview = ''
     if current:
-        html_preview = markdown.markdown(current.content, extensions=['tables', 'nl2br'])
+        html_preview = master_resume_html(current)
 
     return render_template('resume.html',
                            resumes=resumes,
@@ -1711,18 +2112,22 @@ def save_resume():
     is_default = request.form.get('is_default') == 'on'
 
     if resume_id:
-        resume = MasterResume.query.get(resume_id)
+        resume = db.session.get(MasterResume, resume_id)
         if resume:
             resume.name = name
             resume.content = content
+            resume.content_html = markdown_to_html(content)
     else:
-        resume = MasterResume(name=name, content=content)
+        resume = MasterResume(name=name, content=content,
+                              content_html=markdown_to_html(content))
         db.session.add(resume)
 
     if is_default:
-        # Unset other defaults
-        MasterResume.query.update({MasterResume.is_default: False})
-        resume.is_default = True
+        # Make this the only default in a single UPDATE
+        db.session.flush()
+        MasterResume.query.update(
+            {MasterResume.is_default: db.case((MasterResume.id == resume.id, True), else_=False)},
+            synchronize_session=False)
 
     db.session.commit()
     flash('Resume saved', 'success')
@@ -1742,8 +2147,6 @@ def delete_resume(id):
 @app.route('/resume/<int:id>/pdf')
 def download_resume_pdf(id):
     """Generate and download master resume as PDF."""
-    from document_gen import generate_pdf, extract_applicant_info
-    import tempfile
 
     resume = MasterResume.query.get_or_404(id)
 
@@ -1769,7 +2172,7 @@ def download_resume_pdf(id):
             mimetype='application/pdf'
         )
     else:
-        flash('Failed to generate PDF. Please check that md-to-pdf is installed.', 'danger')
+        flash('Failed to generate PDF. Please check that WeasyPrint is installed.', 'danger')
         return redirect(url_for('resume', id=id))
 
 
@@ -1778,7 +2181,6 @@ def download_resume_pdf(id):
 @app.route('/settings')
 def settings():
     """AI provider settings."""
-    from config import Config
     configs = AIConfig.query.all()
     active_config = AIConfig.query.filter_by(is_active=True).first()
 
@@ -1820,11 +2222,14 @@ def save_settings():
     config.api_key = api_key
     config.model_name = model_name
 
-    # Set as active
-    AIConfig.query.update({AIConfig.is_active: False})
-    config.is_active = True
+    # Set as the only active config in a single UPDATE
+    db.session.flush()
+    AIConfig.query.update(
+        {AIConfig.is_active: db.case((AIConfig.id == config.id, True), else_=False)},
+        synchronize_session=False)
 
     db.session.commit()
+    _setting_cache.clear()
     flash('Settings saved', 'success')
     return redirect(url_for('settings'))
 
@@ -1838,33 +2243,14 @@ def test_settings():
 
     try:
         if config.provider == 'claude-cli':
-            # Test Claude CLI by running a simple prompt
-            import subprocess
-            import shutil
             try:
-                # Find claude executable (handles PATH issues)
-                claude_cmd = shutil.which('claude')
+                # Run a simple prompt, re-resolving the CLI in case it was
+                # installed or moved; empty input closes stdin so the CLI
+                # doesn't wait for piped data
+                reset_claude_cache()
                 model = config.model_name or 'claude-sonnet-4-20250514'
-
-                if claude_cmd:
-                    # Full path found, no need for shell
-                    result = subprocess.run(
-                        [claude_cmd, '-p', 'Reply with just the word: OK', '--model', model],
-                        capture_output=True,
-                        text=True,
-                        timeout=30,
-                        shell=False
-                    )
-                else:
-                    # Fallback: use shell on Windows for PATH resolution
-                    cmd = f'claude -p "Reply with just the word: OK" --model {model}'
-                    result = subprocess.run(
-                        cmd,
-                        capture_output=True,
-                        text=True,
-                        timeout=30,
-                        shell=True
-                    )
+                result = run_claude(['-p', 'Reply with just the word: OK', '--model', model],
+                                    timeout=30, input_text='')
                 if result.returncode == 0 and 'OK' in result.stdout:
                     return jsonify({'success': True, 'message': f'Claude CLI working (model: {config.model_name})'})
                 else:
@@ -1877,8 +2263,6 @@ def test_settings():
 
         if config.provider == 'ollama':
             # Test Ollama connection
-            from ai_service import OllamaProvider
-            import requests
 
             base_url = config.api_key or 'http://localhost:11434'
             try:
@@ -1935,7 +2319,6 @@ def test_settings():
             return jsonify({'success': False, 'error': 'This looks like an Anthropic key. Select Claude as provider or use an OpenAI key.'})
 
         if config.provider == 'claude':
-            import anthropic
             # Actually test the Anthropic API
             client = anthropic.Anthropic(api_key=config.api_key)
             response = client.messages.create(
@@ -1945,7 +2328,6 @@ def test_settings():
             )
             return jsonify({'success': True, 'message': f'Connected to {config.model_name}'})
         elif config.provider == 'openai':
-            import openai
             # Actually test the OpenAI API
             client = openai.OpenAI(api_key=config.api_key)
             response = client.chat.completions.create(
@@ -1989,6 +2371,7 @@ def save_boards():
 
     # Save to database
     AppSettings.set('greenhouse_boards', boards)
+    _setting_cache.clear()
     flash(f'Saved {active_count} active boards ({len(boards) - active_count} commented out)', 'success')
     return redirect(url_for('settings'))
 
@@ -2001,6 +2384,7 @@ def restore_default_boards():
     if setting:
         db.session.delete(setting)
         db.session.commit()
+    _setting_cache.clear()
 
     flash('Restored default boards', 'success')
     return redirect(url_for('settings'))
@@ -2019,6 +2403,7 @@ def save_prompts():
     # Save to database
     AppSettings.set('resume_prompt', resume_prompt)
     AppSettings.set('cover_letter_prompt', cover_letter_prompt)
+    _setting_cache.clear()
 
     flash('AI prompts saved', 'success')
     return redirect(url_for('settings'))
@@ -2033,6 +2418,7 @@ def restore_default_prompts():
         if setting:
             db.session.delete(setting)
     db.session.commit()
+    _setting_cache.clear()
 
     flash('Restored default prompts', 'success')
     return redirect(url_for('settings'))
@@ -2041,7 +2427,6 @@ def restore_default_prompts():
 @app.route('/settings/ollama-models')
 def get_ollama_models():
     """Get list of available Ollama models."""
-    from ai_service import OllamaProvider
 
     base_url = request.args.get('base_url', 'http://localhost:11434')
     models = OllamaProvider.list_models(base_url)
@@ -2055,8 +2440,6 @@ def get_ollama_models():
 @app.route('/settings/claude-models')
 def get_claude_models():
     """Get list of available Claude models by querying the Anthropic API."""
-    import shutil
-    import subprocess
 
     models = []
     source = None
@@ -2068,7 +2451,6 @@ def get_claude_models():
 
     if config and config.api_key:
         try:
-            import anthropic
             client = anthropic.Anthropic(api_key=config.api_key)
             response = client.models.list(limit=100)
             for model in response.data:
@@ -2086,20 +2468,7 @@ def get_claude_models():
     # Try 2: Use Claude CLI to ask for available models
     if not models:
         try:
-            import re
-            claude_cmd = shutil.which('claude') or 'claude'
-            use_shell = not shutil.which('claude') and os.name == 'nt'
-            prompt = "Show list of available models"
-            if use_shell:
-                cmd_str = f'claude -p "{prompt}"'
-                result = subprocess.run(cmd_str, capture_output=True,
-                                        text=True, encoding='utf-8', errors='replace',
-                                        timeout=30, shell=True)
-            else:
-                result = subprocess.run(
-                    [claude_cmd, '-p', prompt],
-                    capture_output=True, text=True, encoding='utf-8', errors='replace',
-                    timeout=30, shell=False)
+            result = run_claude(['-p', "Show list of available models"], timeout=30)
             if result.returncode == 0 and result.stdout.strip():
                 # Parse markdown table rows: | Name | `model-id` |
                 # Match lines like: | Claude Opus 4.6 | `claude-opus-4-6` |
@@ -2152,7 +2521,17 @@ def get_claude_models():
     })
 
 
+# Compile every template now (or load it from the bytecode cache) so the first
+# request to each page doesn't pay for it. Must run after the filters above are
+# registered, since templates using an unknown filter fail to compile.
+for template_name in app.jinja_env.list_templates(extensions=['html']):
+    app.jinja_env.get_template(template_name)
+
+
 # ============ Run ============
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    # Development server; handle each request in its own thread so long AI
+    # generations don't block other pages. See docs/installation.md for
+    # running under a production WSGI server.
+    app.run(debug=True, port=5000, threaded=True)
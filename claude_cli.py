@@ -1,26 +1,88 @@
 """Claude CLI provider - uses Claude Code subprocess for AI generation."""
+import asyncio
 import os
+import shlex
 import subprocess
 import shutil
-from pathlib import Path
 from typing import Optional
 
 from logger import get_logger
-from ai_service import _clean_cover_letter
+from ai_service import (AIProvider, _COVER_PROMPT_TMPL, _LETTER_FORMAT, _RESUME_PROMPT_TMPL,
+                        _extract_cover_letter)
 
 log = get_logger('claude_cli')
 
 
+# Full path of the claude executable, once found (PATH lookups are not free,
+# and the settings test and every provider construction need it)
+_claude_path = None
+# `claude --version` output from the first successful check, so later
+# provider constructions skip the probe subprocess
+_claude_version = None
+
+
+def reset_claude_cache():
+    """Forget the cached executable path and version (e.g. after reinstalling the CLI)."""
+    global _claude_path, _claude_version
+    _claude_path = _claude_version = None
+
+
 def _get_claude_cmd():
     """Get the claude command, handling PATH issues."""
+    global _claude_path
     # Try to get full path - if found, we don't need shell=True
-    full_path = shutil.which('claude')
-    if full_path:
-        return full_path, False  # Return (cmd, use_shell)
+    if _claude_path is None:
+        _claude_path = shutil.which('claude')
+    if _claude_path:
+        return _claude_path, False  # Return (cmd, use_shell)
     # Fallback: use 'claude' with shell=True on Windows for PATH resolution
     return 'claude', (os.name == 'nt')
 
 
+def _run_cmd(cmd_list, use_shell: bool, timeout=300, cwd=None, input_text=None):
+    """Run a command, handling shell mode and encoding correctly on Windows."""
+    if use_shell:
+        # When using shell=True, join into a proper command string
+        # On Windows, we need to quote arguments properly
+        if os.name == 'nt':
+            # Simple quoting for Windows - wrap args with spaces in quotes
+            cmd_str = ' '.join(
+                f'"{arg}"' if ' ' in arg or '"' in arg else arg
+                for arg in cmd_list
+            )
+        else:
+            cmd_str = shlex.join(cmd_list)
+        return subprocess.run(
+            cmd_str,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=timeout,
+            cwd=cwd,
+            input=input_text,
+            shell=True
+        )
+    else:
+        return subprocess.run(
+            cmd_list,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=timeout,
+            cwd=cwd,
+            input=input_text,
+            shell=False
+        )
+
+
+def run_claude(args: list, timeout=300, cwd=None, input_text=None):
+    """Run the claude executable with args (see _run_cmd)."""
+    claude_cmd, use_shell = _get_claude_cmd()
+    return _run_cmd([claude_cmd] + args, use_shell, timeout, cwd, input_text)
+
+
 class ClaudeCLIProvider:
     """AI provider that uses Claude CLI subprocess."""
 
@@ -30,100 +92,63 @@ class ClaudeCLIProvider:
         self.claude_cmd, self.use_shell = _get_claude_cmd()
         self.resume_prompt = resume_prompt
         self.cover_letter_prompt = cover_letter_prompt
-        # Verify claude is available
+        # Verify claude is available (once per process)
+        global _claude_version
+        if _claude_version is not None:
+            return
         try:
             result = self._run_cmd([self.claude_cmd, '--version'], timeout=10)
             if result.returncode != 0:
                 raise RuntimeError(f"Claude CLI not available: {result.stderr}")
-            log.info(f"Claude CLI available: {result.stdout.strip()}")
+            _claude_version = result.stdout.strip()
+            log.info(f"Claude CLI available: {_claude_version}")
         except FileNotFoundError:
             raise RuntimeError("Claude CLI not found. Please install it first.")
         except subprocess.TimeoutExpired:
             raise RuntimeError("Claude CLI timed out")
 
     def _run_cmd(self, cmd_list, timeout=300, cwd=None, input_text=None):
-        """Run a command, handling shell mode and encoding correctly on Windows."""
-        if self.use_shell:
-            # When using shell=True, join into a proper command string
-            import shlex
-            # On Windows, we need to quote arguments properly
-            if os.name == 'nt':
-                # Simple quoting for Windows - wrap args with spaces in quotes
-                cmd_str = ' '.join(
-                    f'"{arg}"' if ' ' in arg or '"' in arg else arg
-                    for arg in cmd_list
-                )
-            else:
-                cmd_str = shlex.join(cmd_list)
-            return subprocess.run(
-                cmd_str,
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                timeout=timeout,
-                cwd=cwd,
-                input=input_text,
-                shell=True
-            )
-        else:
-            return subprocess.run(
-                cmd_list,
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                timeout=timeout,
-                cwd=cwd,
-                input=input_text,
-                shell=False
-            )
+        """Run a command with this provider's shell mode (see _run_cmd)."""
+        return _run_cmd(cmd_list, self.use_shell, timeout, cwd, input_text)
 
-    def generate_tailored_resume(self, master_resume: str, job_description: str,
-                                  app_dir: str) -> str:
+    async def _arun_cmd(self, cmd_list, timeout=300, cwd=None, input_text=None):
         """
-        Generate a tailored resume using Claude CLI.
+        Async variant of _run_cmd, so several generations can be overlapped.
 
-        Args:
-            master_resume: The master resume content (markdown)
-            job_description: The job description text
-            app_dir: Directory where source files are saved and output will be written
-
-        Returns:
-            The tailored resume content (markdown)
+        Runs the process with asyncio.create_subprocess_exec and reads both
+        streams to EOF with communicate(). Shell mode (Windows without claude
+        on PATH) falls back to the blocking call in a worker thread.
         """
-        app_path = Path(app_dir)
-        app_path.mkdir(parents=True, exist_ok=True)
-
+        if self.use_shell:
+            return await asyncio.to_thread(self._run_cmd, cmd_list, timeout, cwd, input_text)
+        proc = await asyncio.create_subprocess_exec(
+            *cmd_list,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(input_text.encode('utf-8') if input_text else None), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise subprocess.TimeoutExpired(cmd_list, timeout)
+        return subprocess.CompletedProcess(cmd_list, proc.returncode,
+                                           stdout.decode('utf-8', errors='replace'),
+                                           stderr.decode('utf-8', errors='replace'))
+
+    def _resume_prompt(self, master_resume: str, job_description: str) -> str:
+        """Build the resume prompt with content inline (Claude CLI -p doesn't have file access)."""
         # Use custom prompt if provided, otherwise use default
-        base_instructions = self.resume_prompt or """You are an expert resume writer. Your task is to tailor a resume for a specific job posting.
-
-INSTRUCTIONS:
-1. Keep the same overall structure and format (Markdown), including all HTML/CSS styling
-2. PRESERVE ALL JOB SECTIONS - do NOT remove any jobs from the Professional Experience section
-3. For each job, rewrite bullet points to emphasize skills relevant to the target role
-4. Incorporate keywords from the job description naturally into bullet points
-5. Adjust the Professional Summary to highlight the most relevant experience
-6. Reorder Technical Skills to put the most relevant ones first
-7. Keep all job dates, titles, and companies exactly as they appear
-8. Ensure the resume is ATS-friendly"""
-
-        # Build full prompt with content inline (Claude CLI -p doesn't have file access)
-        full_prompt = f"""{base_instructions}
-
-MASTER RESUME:
-{master_resume}
-
-JOB DESCRIPTION:
-{job_description}
-
-Return ONLY the tailored resume in Markdown format, no explanations or preamble."""
-
-        log.info("Calling Claude CLI for resume generation...")
-        cmd = [self.claude_cmd, '-p', '-', '--model', self.model]
-        log.debug(f"Prompt length: {len(full_prompt)} chars")
-        result = self._run_cmd(cmd, timeout=300, input_text=full_prompt)
+        base_instructions = self.resume_prompt or AIProvider.DEFAULT_RESUME_PROMPT
+        return _RESUME_PROMPT_TMPL.format(instructions=base_instructions,
+                                          master_resume=master_resume,
+                                          job_description=job_description)
 
+    def _check_resume(self, result) -> str:
+        """Validate a resume generation's process result and return the resume."""
         if result.returncode != 0:
             log.error(f"Claude CLI error (rc={result.returncode}): stderr={result.stderr[:500]}")
             raise RuntimeError(f"Claude CLI failed: {result.stderr or 'Unknown error'}")
@@ -140,74 +165,54 @@ Return ONLY the tailored resume in Markdown format, no explanations or preamble.
             raise RuntimeError(f"Claude CLI returned invalid resume (only {len(tailored_resume)} chars). Output: {tailored_resume[:200]}")
 
         log.info(f"Generated tailored resume: {len(tailored_resume)} chars")
-
-        # Save for reference
-        output_path = app_path / 'tailored_resume.md'
-        output_path.write_text(tailored_resume, encoding='utf-8')
-
         return tailored_resume
 
-    def generate_cover_letter(self, resume: str, job_description: str,
-                               company: str, job_title: str,
-                               app_dir: str, hiring_manager: str = None) -> str:
+    def generate_tailored_resume(self, master_resume: str, job_description: str) -> str:
         """
-        Generate a cover letter using Claude CLI.
+        Generate a tailored resume using Claude CLI.
+
+        The prompt, with the resume and job description inline, is piped to the
+        CLI over stdin, so nothing is written to disk.
 
         Args:
-            resume: The tailored resume content (markdown)
+            master_resume: The master resume content (markdown)
             job_description: The job description text
-            company: Company name
-            job_title: Job title
-            app_dir: Directory where source files are saved and output will be written
-            hiring_manager: Name of hiring manager (optional)
 
         Returns:
-            The cover letter content (markdown)
+            The tailored resume content (markdown)
         """
-        app_path = Path(app_dir)
-        app_path.mkdir(parents=True, exist_ok=True)
+        full_prompt = self._resume_prompt(master_resume, job_description)
 
-        # Use custom prompt if provided, otherwise use default
-        base_instructions = self.cover_letter_prompt or """You are an expert cover letter writer. Create a compelling cover letter for a job application.
-
-INSTRUCTIONS:
-1. Open with genuine enthusiasm for the specific role and company
-2. Connect 2-3 key experiences from the resume to job requirements
-3. Show knowledge of the company/industry
-4. Demonstrate cultural fit and soft skills
-5. Close with a clear call to action
-6. Keep it concise (3-4 paragraphs)
-7. Use a professional but personable tone
-8. DO NOT include any placeholder text like [Current Date], [Your Name], [Company Address], etc.
-9. DO NOT include a header with addresses - start directly with the greeting (e.g., "Dear Hiring Manager,")
-10. Extract the applicant's name from the resume and use it in the signature"""
-
-        # Build greeting instruction
-        if hiring_manager:
-            greeting_instruction = f"HIRING MANAGER: {hiring_manager} (use 'Dear {hiring_manager},' as the greeting)"
-        else:
-            greeting_instruction = "HIRING MANAGER: Unknown (use 'Dear Hiring Manager,' as the greeting)"
-
-        # Build full prompt with content inline (Claude CLI -p doesn't have file access)
-        full_prompt = f"""{base_instructions}
-
-RESUME:
-{resume}
-
-JOB DESCRIPTION:
-{job_description}
-
-COMPANY: {company}
-POSITION: {job_title}
-{greeting_instruction}
+        log.info("Calling Claude CLI for resume generation...")
+        cmd = [self.claude_cmd, '-p', '-', '--model', self.model]
+        log.debug(f"Prompt length: {len(full_prompt)} chars")
+        result = self._run_cmd(cmd, timeout=300, input_text=full_prompt)
 
-Return ONLY the cover letter in Markdown format, no explanations or preamble."""
+        return self._check_resume(result)
 
-        log.info("Calling Claude CLI for cover letter generation...")
+    async def agenerate_tailored_resume(self, master_resume: str, job_description: str) -> str:
+        """Async variant of generate_tailored_resume (usable with ai_service.abatch_generate)."""
+        full_prompt = self._resume_prompt(master_resume, job_description)
         cmd = [self.claude_cmd, '-p', '-', '--model', self.model]
-        log.debug(f"Prompt length: {len(full_prompt)} chars")
-        result = self._run_cmd(cmd, timeout=180, input_text=full_prompt)
+        result = await self._arun_cmd(cmd, timeout=300, input_text=full_prompt)
 
+        return self._check_resume(result)
+
+    def _cover_letter_prompt(self, resume: str, job_description: str, company: str,
+                             job_title: str, hiring_manager: str = None) -> str:
+        """Build the cover letter prompt with content inline."""
+        # Use custom prompt if provided, otherwise use default
+        base_instructions = self.cover_letter_prompt or AIProvider.DEFAULT_COVER_LETTER_PROMPT
+        return _COVER_PROMPT_TMPL.format(instructions=base_instructions,
+                                         resume=resume,
+                                         job_description=job_description,
+                                         company=company,
+                                         job_title=job_title,
+                                         greeting_line=AIProvider._greeting_line(hiring_manager),
+                                         letter_format=_LETTER_FORMAT)
+
+    def _check_cover_letter(self, result) -> str:
+        """Validate a cover letter generation's process result and return the letter."""
         if result.returncode != 0:
             log.error(f"Claude CLI error (rc={result.returncode}): stderr={result.stderr[:500]}")
             raise RuntimeError(f"Claude CLI failed: {result.stderr or 'Unknown error'}")
@@ -224,14 +229,45 @@ Return ONLY the cover letter in Markdown format, no explanations or preamble."""
 
         log.info(f"Generated cover letter: {len(cover_letter)} chars")
 
-        # Clean up placeholder text if any slipped through
-        cover_letter = _clean_cover_letter(cover_letter)
+        # Strip the output delimiters (or placeholder text if the format was ignored)
+        return _extract_cover_letter(cover_letter)
 
-        # Save for reference
-        output_path = app_path / 'cover_letter.md'
-        output_path.write_text(cover_letter, encoding='utf-8')
+    def generate_cover_letter(self, resume: str, job_description: str,
+                               company: str, job_title: str,
+                               hiring_manager: str = None) -> str:
+        """
+        Generate a cover letter using Claude CLI.
 
-        return cover_letter
+        Args:
+            resume: The tailored resume content (markdown)
+            job_description: The job description text
+            company: Company name
+            job_title: Job title
+            hiring_manager: Name of hiring manager (optional)
+
+        Returns:
+            The cover letter content (markdown)
+        """
+        full_prompt = self._cover_letter_prompt(resume, job_description, company,
+                                                job_title, hiring_manager)
+
+        log.info("Calling Claude CLI for cover letter generation...")
+        cmd = [self.claude_cmd, '-p', '-', '--model', self.model]
+        log.debug(f"Prompt length: {len(full_prompt)} chars")
+        result = self._run_cmd(cmd, timeout=180, input_text=full_prompt)
+
+        return self._check_cover_letter(result)
+
+    async def agenerate_cover_letter(self, resume: str, job_description: str,
+                                     company: str, job_title: str,
+                                     hiring_manager: str = None) -> str:
+        """Async variant of generate_cover_letter (see agenerate_tailored_resume)."""
+        full_prompt = self._cover_letter_prompt(resume, job_description, company,
+                                                job_title, hiring_manager)
+        cmd = [self.claude_cmd, '-p', '-', '--model', self.model]
+        result = await self._arun_cmd(cmd, timeout=180, input_text=full_prompt)
+
+        return self._check_cover_letter(result)
 
     def chat(self, messages: list, context: str = None) -> str:
         """
@@ -283,14 +319,9 @@ Return ONLY the cover letter in Markdown format, no explanations or preamble."""
 
 def is_claude_cli_available() -> bool:
     """Check if Claude CLI is available on the system."""
+    if _claude_version is not None:
+        return True
     try:
-        claude_cmd, use_shell = _get_claude_cmd()
-        if use_shell:
-            # When using shell=True, pass as string
-            cmd = f'"{claude_cmd}" --version' if ' ' in claude_cmd else f'{claude_cmd} --version'
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5, shell=True)
-        else:
-            result = subprocess.run([claude_cmd, '--version'], capture_output=True, text=True, timeout=5, shell=False)
-        return result.returncode == 0
+        return run_claude(['--version'], timeout=5).returncode == 0
     except (FileNotFoundError, subprocess.TimeoutExpired):
         return False
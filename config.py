@@ -13,6 +13,10 @@ class Config:
     DATA_DIR = os.path.join(BASE_DIR, 'data')
     APPLICATIONS_DIR = os.path.join(DATA_DIR, 'applications')
 
+    # Let a front-end server (Apache mod_xsendfile, lighttpd) stream downloads
+    # from disk via the X-Sendfile header instead of sending them from Python
+    USE_X_SENDFILE = os.environ.get('JASS_X_SENDFILE') == '1'
+
     # Default AI settings
     DEFAULT_AI_PROVIDER = 'claude'
     DEFAULT_AI_MODEL = 'claude-sonnet-4-20250514'
@@ -1,14 +1,32 @@
-"""Document generation - Markdown to PDF conversion using md-to-pdf."""
+"""Document generation - Markdown to PDF conversion using WeasyPrint."""
 import os
 import re
 import shutil
-import subprocess
-import markdown
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from markdown_it import MarkdownIt
 
 from logger import get_logger
 
 log = get_logger('document_gen')
 
+try:
+    from weasyprint import CSS, HTML
+except (ImportError, OSError):  # OSError: Pango system libraries are missing
+    CSS = HTML = None
+
+# Characters not allowed in generated folder and file names
+_UNSAFE_NAME_RE = re.compile(r'[^\w\s-]')
+_STYLE_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+# Contact details in a resume header (the email's local part is group 1)
+_EMAIL_RE = re.compile(r'([\w\.-]+)@[\w\.-]+\.\w+')
+_PHONE_RE = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+_EMAIL_NAME_SEP_RE = re.compile(r'[._]')
+
 
 def get_application_folder_name(company: str, job_id: int) -> str:
     """
@@ -22,15 +40,66 @@ def get_application_folder_name(company: str, job_id: int) -> str:
         Folder name in format: Company_JobId
     """
     if company:
-        safe_company = re.sub(r'[^\w\s-]', '', company).strip().replace(' ', '_')
+        safe_company = _UNSAFE_NAME_RE.sub('', company).strip().replace(' ', '_')
         return f"{safe_company}_{job_id}"
     return str(job_id)
 
 
+# PDF page styles: a shared base plus a per-document-type layer
+_PDF_BASE_STYLE = """
+@page { size: A4; margin: 20mm 18mm; }
+body {
+    font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif;
+    font-size: 11pt; line-height: 1.5; color: #24292f;
+}
+h1, h2, h3 { line-height: 1.25; margin: 1em 0 0.5em; }
+h1 { font-size: 1.9em; }
+h2 { font-size: 1.4em; padding-bottom: 0.2em; border-bottom: 1px solid #d0d7de; }
+h3 { font-size: 1.15em; }
+p, ul, ol, table { margin: 0 0 0.8em; }
+a { color: #0969da; text-decoration: none; }
+table { border-collapse: collapse; }
+th, td { padding: 4px 10px; border: 1px solid #d0d7de; }
+code, pre { font-family: Consolas, "Liberation Mono", monospace; font-size: 0.9em; }
+pre { padding: 10px; background: #f6f8fa; white-space: pre-wrap; }
+"""
+_PDF_STYLES = {
+    'resume': """
+h1 { margin-top: 0; }
+h2, h3 { page-break-after: avoid; }
+li { margin: 0.15em 0; }
+""",
+    'cover_letter': """
+@page { margin: 25mm 25mm; }
+p { margin-bottom: 1em; }
+""",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _pdf_stylesheet(doc_type: str):
+    """Parse the stylesheet for a document type once per process."""
+    return CSS(string=_PDF_BASE_STYLE + _PDF_STYLES.get(doc_type, ''))
+
+
+# Reusable Markdown parsers per thread (the linkify matcher keeps per-call state)
+_converters = threading.local()
+
+
 def markdown_to_html(md_content: str) -> str:
-    """Convert Markdown to HTML."""
-    extensions = ['tables', 'fenced_code', 'nl2br']
-    return markdown.markdown(md_content, extensions=extensions)
+    """
+    Convert Markdown to HTML; used for both previews and PDFs.
+
+    CommonMark with GFM tables, strikethrough and autolinks, with line breaks
+    kept. CommonMark ends a raw HTML block at a blank line, so Markdown inside
+    the resume's centered header <div> is still rendered.
+    """
+    md = getattr(_converters, 'md', None)
+    if md is None:
+        md = _converters.md = MarkdownIt(
+            'commonmark', {'html': True, 'linkify': True, 'breaks': True}).enable(
+            ['table', 'strikethrough', 'linkify'])
+    return md.render(md_content)
 
 
 def extract_applicant_info(resume_content: str) -> dict:
@@ -55,75 +124,152 @@ def extract_applicant_info(resume_content: str) -> dict:
     }
 
     # Remove <style>...</style> blocks before processing
-    content = re.sub(r'<style[^>]*>.*?</style>', '', resume_content, flags=re.DOTALL | re.IGNORECASE)
+    content = _STYLE_RE.sub('', resume_content)
     lines = content.strip().split('\n')
 
-    # Look for # Name pattern anywhere in first 50 lines
+    # Single pass over the first 50 lines: the name comes from the first
+    # top-level header, contact info from the non-header lines, and the first
+    # email is remembered in case the name has to come from it
+    header_seen = False
+    email_prefix = None
+    contact_done = False
     for line in lines[:50]:
         line = line.strip()
-        # Skip empty lines and HTML tags
-        if not line or (line.startswith('<') and '#' not in line):
-            continue
+        email_match = None if contact_done else _EMAIL_RE.search(line)
+        if email_match and email_prefix is None:
+            email_prefix = email_match.group(1)
 
-        # Check for markdown header with name
-        if line.startswith('#') and not line.startswith('##'):
-            name = line.lstrip('#').strip()
-            # Remove any trailing HTML tags
-            name = re.sub(r'<[^>]+>', '', name).strip()
-            parts = name.split()
-            if len(parts) >= 2:
-                info['first_name'] = parts[0]
-                info['last_name'] = ' '.join(parts[1:])
-                log.debug(f"Extracted name from header: {info['first_name']} {info['last_name']}")
-            elif len(parts) == 1:
-                info['first_name'] = parts[0]
-                log.debug(f"Extracted first name from header: {info['first_name']}")
-            break
-
-    # If no name found yet, try to find from email
-    if not info['first_name']:
-        for line in lines[:50]:
-            email_match = re.search(r'([\w\.-]+)@[\w\.-]+\.\w+', line)
-            if email_match:
-                email_prefix = email_match.group(1)
-                # Try to extract name from email like demian.vladi or demian_vladi
-                parts = re.split(r'[._]', email_prefix)
-                if len(parts) >= 2:
-                    info['first_name'] = parts[0].capitalize()
-                    info['last_name'] = parts[1].capitalize()
-                    log.debug(f"Extracted name from email: {info['first_name']} {info['last_name']}")
-                elif len(parts) == 1 and parts[0]:
-                    info['first_name'] = parts[0].capitalize()
-                    log.debug(f"Extracted first name from email: {info['first_name']}")
-                break
-
-    # Look for contact info line (email, phone)
-    for line in lines[:50]:
-        line = line.strip()
-        # Skip header lines
         if line.startswith('#'):
+            # Check for markdown header with name
+            if not header_seen and not line.startswith('##'):
+                header_seen = True
+                name = line.lstrip('#').strip()
+                # Remove any trailing HTML tags
+                name = _TAG_RE.sub('', name).strip()
+                parts = name.split()
+                if len(parts) >= 2:
+                    info['first_name'] = parts[0]
+                    info['last_name'] = ' '.join(parts[1:])
+                    log.debug(f"Extracted name from header: {info['first_name']} {info['last_name']}")
+                elif len(parts) == 1:
+                    info['first_name'] = parts[0]
+                    log.debug(f"Extracted first name from header: {info['first_name']}")
             continue
 
-        # Find email
-        email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', line)
-        if email_match:
-            info['email'] = email_match.group()
+        if not contact_done:
+            # Find email
+            if email_match:
+                info['email'] = email_match.group()
+
+            # Find phone (various formats)
+            phone_match = _PHONE_RE.search(line)
+            if phone_match:
+                info['phone'] = phone_match.group()
 
-        # Find phone (various formats)
-        phone_match = re.search(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', line)
-        if phone_match:
-            info['phone'] = phone_match.group()
+            contact_done = bool(info['email'] and info['phone'])
 
-        # If we found both, stop looking
-        if info['email'] and info['phone']:
+        # Stop once both the name header and the contact info are found
+        if header_seen and contact_done:
             break
 
+    # If no name found in a header, try to find it from the email
+    if not info['first_name'] and email_prefix is not None:
+        # Try to extract name from email like demian.vladi or demian_vladi
+        parts = _EMAIL_NAME_SEP_RE.split(email_prefix)
+        if len(parts) >= 2:
+            info['first_name'] = parts[0].capitalize()
+            info['last_name'] = parts[1].capitalize()
+            log.debug(f"Extracted name from email: {info['first_name']} {info['last_name']}")
+        elif len(parts) == 1 and parts[0]:
+            info['first_name'] = parts[0].capitalize()
+            log.debug(f"Extracted first name from email: {info['first_name']}")
+
     return info
 
 
+def _render_pdf(md_content: str, output_path: str, doc_type: str) -> bool:
+    """Render one PDF with WeasyPrint (runs in a _pdf_pool worker process)."""
+    try:
+        # Ensure output directory exists
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        body = markdown_to_html(md_content)
+        html = f'<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>{body}</body></html>'
+        HTML(string=html, base_url=output_dir or '.').write_pdf(
+            output_path, stylesheets=[_pdf_stylesheet(doc_type)])
+
+        log.info(f"PDF generated successfully: {output_path}")
+        return True
+
+    except Exception as e:
+        log.error(f"Error generating PDF: {e}", exc_info=True)
+        return False
+
+
+# WeasyPrint lays pages out in Python (holding the GIL) and makes no
+# thread-safety promise, so PDFs are rendered in worker processes: each worker
+# renders one document at a time, and a resume and cover letter render in
+# parallel. Workers are spawned (forking a threaded server is unsafe) on first
+# use and kept, so WeasyPrint (and, as with any spawned worker, the main
+# script) is imported once per worker.
+PDF_WORKERS = min(2, os.cpu_count() or 1)
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Get the PDF worker pool, starting it on first use."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _pdf_pool
+
+
+def _discard_pdf_pool(pool: ProcessPoolExecutor):
+    """Drop a broken worker pool so the next render starts a new one."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False)
+
+
+def generate_pdfs(pdf_jobs) -> list:
+    """
+    Generate several PDFs from Markdown at once, in the PDF worker processes.
+
+    Args:
+        pdf_jobs: (md_content, output_path, doc_type) tuples
+
+    Returns:
+        Whether each PDF was generated, in order
+    """
+    if HTML is None:
+        log.error("WeasyPrint is not available; install it with its Pango system libraries")
+        return [False] * len(pdf_jobs)
+    for _, output_path, doc_type in pdf_jobs:
+        log.info(f"Generating {doc_type} PDF: {output_path}")
+
+    pool = _get_pdf_pool()
+    futures = [pool.submit(_render_pdf, *pdf_job) for pdf_job in pdf_jobs]
+    results = []
+    for future, (_, output_path, _) in zip(futures, pdf_jobs):
+        try:
+            results.append(future.result())
+        except BrokenProcessPool as e:
+            log.error(f"PDF worker died rendering {output_path}: {e}")
+            _discard_pdf_pool(pool)
+            results.append(False)
+    return results
+
+
 def generate_pdf(md_content: str, output_path: str, doc_type: str = 'resume') -> bool:
     """
-    Generate a PDF from Markdown content using md-to-pdf.
+    Generate a PDF from Markdown content using WeasyPrint.
 
     Args:
         md_content: Markdown content
@@ -133,51 +279,30 @@ def generate_pdf(md_content: str, output_path: str, doc_type: str = 'resume') ->
     Returns:
         True if successful
     """
-    log.info(f"Generating {doc_type} PDF: {output_path}")
-    try:
-        # Ensure output directory exists
-        output_dir = os.path.dirname(output_path)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
+    return generate_pdfs([(md_content, output_path, doc_type)])[0]
 
-        # Create temp markdown file
-        temp_md = output_path.replace('.pdf', '.md')
-        log.debug(f"Writing temp markdown to {temp_md}")
-        with open(temp_md, 'w', encoding='utf-8') as f:
-            f.write(md_content)
-
-        # Get the directory where this script is located (for node_modules)
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-
-        # Use platform-appropriate md-to-pdf binary
-        if os.name == 'nt':
-            md_to_pdf_path = os.path.join(script_dir, 'node_modules', '.bin', 'md-to-pdf.cmd')
-        else:
-            md_to_pdf_path = os.path.join(script_dir, 'node_modules', '.bin', 'md-to-pdf')
-
-        log.debug(f"Running md-to-pdf: {md_to_pdf_path}")
-        # Run md-to-pdf
-        result = subprocess.run(
-            [md_to_pdf_path, temp_md],
-            capture_output=True,
-            text=True,
-            cwd=script_dir
-        )
-
-        if result.returncode != 0:
-            log.error(f"md-to-pdf error: {result.stderr}")
-            return False
-
-        if os.path.exists(output_path):
-            log.info(f"PDF generated successfully: {output_path}")
-            return True
-        else:
-            log.error(f"PDF not found after generation: {output_path}")
-            return False
 
-    except Exception as e:
-        log.error(f"Error generating PDF: {e}", exc_info=True)
-        return False
+def _replace_resume_copies(script_dir: str, paths: dict, clear):
+    """
+    Copy saved documents into the Jass/resume directory.
+
+    Files whose name matches clear(name) are deleted first. scandir's is_file()
+    uses the directory entry type, so listing the folder needs no stat per file.
+    """
+    resume_copy_dir = os.path.join(script_dir, 'resume')
+    log.info(f"Copying documents to {resume_copy_dir}")
+    os.makedirs(resume_copy_dir, exist_ok=True)
+
+    with os.scandir(resume_copy_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and clear(entry.name):
+                os.remove(entry.path)
+
+    sources = [paths[key] for key in ('resume_pdf', 'cover_letter_pdf', 'resume_md', 'cover_letter_md')
+               if paths.get(key)]
+    for source in sources:
+        shutil.copy2(source, resume_copy_dir)
+    log.debug(f"Copied {len(sources)} files to resume directory")
 
 
 def save_application_documents(job_id: int, resume_md: str, cover_letter_md: str,
@@ -223,7 +348,7 @@ def save_application_documents(job_id: int, resume_md: str, cover_letter_md: str
         file_base = first_name
 
     # Sanitize file base name
-    file_base = re.sub(r'[^\w\s-]', '', file_base).strip().replace(' ', '_')
+    file_base = _UNSAFE_NAME_RE.sub('', file_base).strip().replace(' ', '_')
 
     # Fallback if file_base is empty
     if not file_base:
@@ -241,9 +366,6 @@ def save_application_documents(job_id: int, resume_md: str, cover_letter_md: str
         f.write(resume_md)
     paths['resume_md'] = resume_md_path
 
-    if generate_pdf(resume_md, resume_pdf_path, 'resume'):
-        paths['resume_pdf'] = resume_pdf_path
-
     # Save cover letter
     cl_md_path = os.path.join(job_dir, f'{file_base}_cover.md')
     cl_pdf_path = os.path.join(job_dir, f'{file_base}_cover.pdf')
@@ -253,43 +375,17 @@ def save_application_documents(job_id: int, resume_md: str, cover_letter_md: str
         f.write(cover_letter_md)
     paths['cover_letter_md'] = cl_md_path
 
-    if generate_pdf(cover_letter_md, cl_pdf_path, 'cover_letter'):
+    # Both PDFs render in parallel
+    resume_ok, cover_ok = generate_pdfs([(resume_md, resume_pdf_path, 'resume'),
+                                         (cover_letter_md, cl_pdf_path, 'cover_letter')])
+    if resume_ok:
+        paths['resume_pdf'] = resume_pdf_path
+    if cover_ok:
         paths['cover_letter_pdf'] = cl_pdf_path
 
     # Copy to Jass/resume directory (replacing previous)
     if script_dir:
-        resume_copy_dir = os.path.join(script_dir, 'resume')
-        log.info(f"Copying documents to {resume_copy_dir}")
-        os.makedirs(resume_copy_dir, exist_ok=True)
-
-        # Clear existing files in resume directory
-        log.debug("Clearing existing files in resume directory")
-        for f in os.listdir(resume_copy_dir):
-            fpath = os.path.join(resume_copy_dir, f)
-            if os.path.isfile(fpath):
-                os.remove(fpath)
-
-        # Copy new files
-        if paths.get('resume_pdf'):
-            shutil.copy2(paths['resume_pdf'], resume_copy_dir)
-        if paths.get('cover_letter_pdf'):
-            shutil.copy2(paths['cover_letter_pdf'], resume_copy_dir)
-        if paths.get('resume_md'):
-            shutil.copy2(paths['resume_md'], resume_copy_dir)
-        if paths.get('cover_letter_md'):
-            shutil.copy2(paths['cover_letter_md'], resume_copy_dir)
-        log.debug(f"Copied {len([p for p in paths.values() if p])} files to resume directory")
-
-    # Clean up temporary Claude CLI files
-    temp_files = ['resume.md', 'tailored_resume.md', 'description.md', 'prompt.txt']
-    for temp_file in temp_files:
-        temp_path = os.path.join(job_dir, temp_file)
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-                log.debug(f"Cleaned up temp file: {temp_file}")
-            except OSError as e:
-                log.warning(f"Could not remove temp file {temp_file}: {e}")
+        _replace_resume_copies(script_dir, paths, lambda name: True)
 
     log.info(f"Saved documents: {list(paths.keys())}")
     return paths
@@ -336,7 +432,7 @@ def save_resume_document(job_id: int, resume_md: str, base_dir: str, company: st
         file_base = first_name
 
     # Sanitize file base name
-    file_base = re.sub(r'[^\w\s-]', '', file_base).strip().replace(' ', '_')
+    file_base = _UNSAFE_NAME_RE.sub('', file_base).strip().replace(' ', '_')
 
     # Fallback if file_base is empty
     if not file_base:
@@ -357,34 +453,9 @@ def save_resume_document(job_id: int, resume_md: str, base_dir: str, company: st
     if generate_pdf(resume_md, resume_pdf_path, 'resume'):
         paths['resume_pdf'] = resume_pdf_path
 
-    # Copy to Jass/resume directory
+    # Copy to Jass/resume directory, replacing resume files (not cover letters)
     if script_dir:
-        resume_copy_dir = os.path.join(script_dir, 'resume')
-        log.info(f"Copying resume to {resume_copy_dir}")
-        os.makedirs(resume_copy_dir, exist_ok=True)
-
-        # Clear existing resume files in resume directory (not cover letters)
-        for f in os.listdir(resume_copy_dir):
-            fpath = os.path.join(resume_copy_dir, f)
-            if os.path.isfile(fpath) and '_cover' not in f:
-                os.remove(fpath)
-
-        # Copy new resume files
-        if paths.get('resume_pdf'):
-            shutil.copy2(paths['resume_pdf'], resume_copy_dir)
-        if paths.get('resume_md'):
-            shutil.copy2(paths['resume_md'], resume_copy_dir)
-
-    # Clean up temporary Claude CLI files
-    temp_files = ['resume.md', 'tailored_resume.md', 'description.md', 'prompt.txt']
-    for temp_file in temp_files:
-        temp_path = os.path.join(job_dir, temp_file)
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-                log.debug(f"Cleaned up temp file: {temp_file}")
-            except OSError as e:
-                log.warning(f"Could not remove temp file {temp_file}: {e}")
+        _replace_resume_copies(script_dir, paths, lambda name: '_cover' not in name)
 
     log.info(f"Saved resume documents: {list(paths.keys())}")
     return paths
@@ -425,7 +496,7 @@ def save_cover_letter_document(job_id: int, cover_letter_md: str, base_dir: str,
         file_base = 'Resume'
 
     # Sanitize file base name
-    file_base = re.sub(r'[^\w\s-]', '', file_base).strip().replace(' ', '_')
+    file_base = _UNSAFE_NAME_RE.sub('', file_base).strip().replace(' ', '_')
 
     paths = {}
 
@@ -441,34 +512,9 @@ def save_cover_letter_document(job_id: int, cover_letter_md: str, base_dir: str,
     if generate_pdf(cover_letter_md, cl_pdf_path, 'cover_letter'):
         paths['cover_letter_pdf'] = cl_pdf_path
 
-    # Copy to Jass/resume directory
+    # Copy to Jass/resume directory, replacing cover letter files
     if script_dir:
-        resume_copy_dir = os.path.join(script_dir, 'resume')
-        log.info(f"Copying cover letter to {resume_copy_dir}")
-        os.makedirs(resume_copy_dir, exist_ok=True)
-
-        # Clear existing cover letter files in resume directory
-        for f in os.listdir(resume_copy_dir):
-            fpath = os.path.join(resume_copy_dir, f)
-            if os.path.isfile(fpath) and '_cover' in f:
-                os.remove(fpath)
-
-        # Copy new cover letter files
-        if paths.get('cover_letter_pdf'):
-            shutil.copy2(paths['cover_letter_pdf'], resume_copy_dir)
-        if paths.get('cover_letter_md'):
-            shutil.copy2(paths['cover_letter_md'], resume_copy_dir)
-
-    # Clean up temporary Claude CLI files for cover letter
-    temp_files = ['cover_letter.md', 'prompt.txt']
-    for temp_file in temp_files:
-        temp_path = os.path.join(job_dir, temp_file)
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-                log.debug(f"Cleaned up temp file: {temp_file}")
-            except OSError as e:
-                log.warning(f"Could not remove temp file {temp_file}: {e}")
+        _replace_resume_copies(script_dir, paths, lambda name: '_cover' in name)
 
     log.info(f"Saved cover letter documents: {list(paths.keys())}")
     return paths
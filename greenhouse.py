@@ -1,17 +1,107 @@
 """Greenhouse API client for job searching and applications."""
+import functools
 import requests
 from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
 from datetime import datetime, timezone
 import html
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import lxml.html
+from lxml.etree import ParserError
+
+from config import Config
 from logger import get_logger
+from models import AppSettings
 
 log = get_logger('greenhouse')
 
 
+_UTF8_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+
+def _parse_html(content: str):
+    """Parse an HTML fragment with lxml, or return None if it can't be parsed."""
+    try:
+        return lxml.html.fromstring(content)
+    except ValueError:
+        # lxml refuses str input with an XML encoding declaration; parse the
+        # UTF-8 bytes instead (the parser's encoding overrides the declaration)
+        try:
+            return lxml.html.fromstring(content.encode('utf-8'), parser=_UTF8_HTML_PARSER)
+        except ParserError:
+            return None
+    except ParserError:
+        return None
+
+
+@functools.lru_cache(maxsize=512)
+def html_to_text(content: str, separator: str = None) -> str:
+    """
+    Extract plain text from an HTML fragment using lxml.
+
+    Results are cached by content, since the same stored job descriptions are
+    converted on every duplicate check and tailoring request.
+
+    Args:
+        content: HTML (or plain text) content
+        separator: If given, join stripped text nodes with it (skipping blank
+            ones) instead of concatenating the raw text
+
+    Returns:
+        Text content, or '' for empty input
+    """
+    if not content or not content.strip():
+        return ''
+    doc = _parse_html(content)
+    if doc is None:
+        return ''
+    if separator is None:
+        return doc.text_content()
+    return separator.join(t.strip() for t in doc.itertext() if t.strip())
+
+
+_HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+
+def _is_heading(el) -> bool:
+    """Whether a block is a heading: an h1-h6, or a paragraph that is all bold."""
+    if el.tag in _HEADING_TAGS:
+        return True
+    return (el.tag == 'p' and len(el) == 1 and el[0].tag in ('strong', 'b')
+            and not (el.text or '').strip() and not (el[0].tail or '').strip())
+
+
+@functools.lru_cache(maxsize=512)
+def html_text_blocks(content: str) -> tuple:
+    """
+    Get the text of an HTML fragment's paragraphs, list items and headings.
+
+    Each block's text is a contiguous piece of html_to_text(content), so it
+    can be searched for (or replaced) in the plain-text description.
+
+    Returns:
+        (heading, text) pairs, where heading is the text of the section
+        heading the block falls under ('' before the first heading)
+    """
+    if not content or not content.strip():
+        return ()
+    doc = _parse_html(content)
+    if doc is None:
+        return ()
+    blocks = []
+    heading = ''
+    for el in doc.iter('p', 'li', *_HEADING_TAGS):
+        text = el.text_content().strip()
+        if not text:
+            continue
+        if _is_heading(el):
+            heading = text
+        blocks.append((heading, text))
+    return tuple(blocks)
+
+
 class GreenhouseClient:
     """Client for Greenhouse job board API."""
 
@@ -152,8 +242,6 @@ class GreenhouseClient:
         Yields:
             Tuples of (board_token, list_of_matching_jobs, error_string_or_None)
         """
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-
         log.info(f"Searching {len(board_tokens)} boards in parallel for keywords: {keywords}")
         keywords_lower = [kw.lower() for kw in keywords]
 
@@ -209,8 +297,7 @@ class GreenhouseClient:
         description_text = ''
         if content:
             content = html.unescape(content)
-            soup = BeautifulSoup(content, 'html.parser')
-            description_text = soup.get_text(separator='\n', strip=True)
+            description_text = html_to_text(content, separator='\n')
 
         # Extract departments
         departments = job.get('departments', [])
@@ -296,9 +383,6 @@ def search_greenhouse(keywords: str, boards: List[str] = None,
     Returns:
         List of matching jobs
     """
-    from config import Config
-    from models import AppSettings
-
     client = GreenhouseClient()
     keyword_list = [kw.strip() for kw in keywords.split() if kw.strip()]
 
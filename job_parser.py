@@ -1,5 +1,6 @@
 """Parse job descriptions to extract salary, remote status, experience, and skills."""
 import re
+from datetime import datetime, timedelta
 from typing import Dict, Optional
 from logger import get_logger
 
@@ -154,7 +155,6 @@ def parse_dice_header(text: str) -> Dict:
     "Additional Information" with benefits and salary
     Footer with Dice Id, Position Id
     """
-    from datetime import datetime, timedelta
 
     result = {
         'company': None,
@@ -570,7 +570,6 @@ def parse_linkedin_header(text: str) -> Dict:
     ...
     "About the job" marks end of header
     """
-    from datetime import datetime, timedelta
 
     result = {
         'company': None,
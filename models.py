@@ -1,6 +1,8 @@
 """Database models for JASS - Job Application Support System."""
+import hashlib
+import json
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from datetime import datetime, timedelta
 
 db = SQLAlchemy()
 
@@ -10,6 +12,7 @@ class MasterResume(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)  # Markdown content
+    content_html = db.Column(db.Text)  # Rendered preview, stored when content is saved
     is_default = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -31,6 +34,7 @@ class Job(db.Model):
     location = db.Column(db.String(300))
     url = db.Column(db.String(500))
     description = db.Column(db.Text)
+    description_text = db.Column(db.Text)  # Plain text of description, for AI prompts
     department = db.Column(db.String(200))
     employment_type = db.Column(db.String(100))
 
@@ -56,6 +60,14 @@ class Job(db.Model):
     # Relationships
     application = db.relationship('Application', backref='job', uselist=False, cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_job_status_created', 'status', 'created_at'),
+        # The jobs list hides applied jobs and sorts by newest, so it can read
+        # this index in order instead of sorting the table
+        db.Index('ix_job_unapplied_created', 'created_at',
+                 sqlite_where=db.text("status != 'applied'")),
+    )
+
     def __repr__(self):
         return f'<Job {self.title} at {self.company}>'
 
@@ -71,6 +83,13 @@ class Application(db.Model):
     cover_letter_md = db.Column(db.String(500))
     cover_letter_pdf = db.Column(db.String(500))
 
+    # Document markdown and rendered preview HTML, stored whenever the
+    # documents are written (files are kept for downloads)
+    resume_md_text = db.Column(db.Text)
+    resume_html = db.Column(db.Text)
+    cover_letter_md_text = db.Column(db.Text)
+    cover_letter_html = db.Column(db.Text)
+
     # AI generation metadata
     ai_provider = db.Column(db.String(50))  # claude, openai, etc.
     ai_model = db.Column(db.String(100))
@@ -90,7 +109,7 @@ class Application(db.Model):
     phone = db.Column(db.String(50))
 
     notes = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
@@ -118,7 +137,7 @@ class SearchHistory(db.Model):
     location = db.Column(db.String(200))  # Location filter used
     boards = db.Column(db.Text)  # JSON list of board tokens searched
     result_count = db.Column(db.Integer)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     def __repr__(self):
         return f'<Search "{self.keywords}">'
@@ -133,7 +152,7 @@ class SearchCache(db.Model):
     boards = db.Column(db.Text)  # JSON list of board tokens
     results = db.Column(db.Text, nullable=False)  # JSON list of job results
     result_count = db.Column(db.Integer)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     def __repr__(self):
         return f'<SearchCache "{self.keywords}" ({self.result_count} results)>'
@@ -141,7 +160,6 @@ class SearchCache(db.Model):
     @staticmethod
     def get_cache_key(keywords: str, location: str = None, boards: list = None) -> str:
         """Generate a unique cache key from search parameters."""
-        import hashlib
         key_parts = [keywords.lower().strip()]
         if location:
             key_parts.append(location.lower().strip())
@@ -151,7 +169,6 @@ class SearchCache(db.Model):
 
     def is_valid(self, max_age_hours: int = 24) -> bool:
         """Check if cache entry is still valid."""
-        from datetime import timedelta
         age = datetime.utcnow() - self.created_at
         return age < timedelta(hours=max_age_hours)
 
@@ -171,7 +188,6 @@ class AppSettings(db.Model):
         """Get a setting value."""
         setting = AppSettings.query.filter_by(key=key).first()
         if setting:
-            import json
             try:
                 return json.loads(setting.value)
             except (json.JSONDecodeError, TypeError):
@@ -181,7 +197,6 @@ class AppSettings(db.Model):
     @staticmethod
     def set(key, value):
         """Set a setting value."""
-        import json
         setting = AppSettings.query.filter_by(key=key).first()
         if setting:
             setting.value = json.dumps(value) if not isinstance(value, str) else value
@@ -190,3 +205,25 @@ class AppSettings(db.Model):
             db.session.add(setting)
         db.session.commit()
         return setting
+
+
+def upgrade_schema():
+    """
+    Bring an existing database up to date with the models.
+
+    db.create_all() only creates missing tables, so columns and indexes added
+    to existing tables are created here (call after create_all, inside an app
+    context). New columns must be nullable.
+    """
+    inspector = db.inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {col['name'] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                col_type = column.type.compile(dialect=db.engine.dialect)
+                with db.engine.begin() as conn:
+                    conn.execute(db.text(
+                        f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
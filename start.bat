@@ -19,24 +19,13 @@ REM Install/update Python dependencies
 echo Checking Python dependencies...
 pip install -r requirements.txt --quiet
 
-REM Check if Node.js is installed
-where node >nul 2>&1
+REM Check that WeasyPrint can load its system libraries (GTK runtime)
+python -c "import weasyprint" >nul 2>&1
 if errorlevel 1 (
-    echo ERROR: Node.js is required for PDF generation
-    echo Please install Node.js from https://nodejs.org/
-    pause
-    exit /b 1
-)
-
-REM Check if md-to-pdf is installed
-if not exist "node_modules\md-to-pdf" (
-    echo Installing md-to-pdf for PDF generation...
-    call npm install md-to-pdf --save
-    if errorlevel 1 (
-        echo Failed to install md-to-pdf
-        pause
-        exit /b 1
-    )
+    echo WARNING: WeasyPrint could not load its system libraries
+    echo PDF generation will not work until the GTK runtime is installed:
+    echo   https://doc.courtbouillon.org/weasyprint/stable/first_steps.html
+    echo.
 )
 
 REM Check if Claude CLI is available
@@ -0,0 +1,35 @@
+"""Shared pytest setup: make the application modules importable."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def flask_app(tmp_path_factory):
+    """The Flask app, with its database and data directories in a temp dir."""
+    from config import Config
+
+    data_dir = tmp_path_factory.mktemp('data')
+    # app creates its tables and directories on import, so point it at the
+    # temp dir first
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{data_dir / 'jass.db'}"
+    Config.DATA_DIR = str(data_dir)
+    Config.APPLICATIONS_DIR = str(data_dir / 'applications')
+
+    import app as app_module
+    app_module.app.config['TESTING'] = True
+    return app_module.app
+
+
+@pytest.fixture
+def client(flask_app):
+    """A test client on an empty database."""
+    from models import db
+
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+    return flask_app.test_client()
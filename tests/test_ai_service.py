@@ -0,0 +1,211 @@
+"""Tests for ai_service helpers that don't call a provider."""
+import asyncio
+import shelve
+import threading
+import time
+
+import pytest
+
+import ai_service
+
+LETTER = 'Dear X,\n\nI would love to join.\n\nSincerely,\nJane'
+
+
+@pytest.mark.parametrize('response', [
+    f'<<<LETTER>>>\n{LETTER}\n<<<END>>>',
+    f'Here you go:\n<<<LETTER>>>\n{LETTER}\n<<<END>>>\nGood luck!',
+    f'<<<LETTER>>> {LETTER}\n<<<END>>>',
+    f'<<<LETTER>>>{LETTER}<<<END>>>',
+    f'<<<LETTER>>>\r\n{LETTER}\r\n<<<END>>>\r\n'.replace('\n\n', '\r\n\r\n'),
+    f'{LETTER}\n<<<END>>>',
+    f'<<<LETTER>>>\n{LETTER}',
+    f'[Current Date]\n\n<<<LETTER>>>\n{LETTER}\n<<<END>>>',
+])
+def test_extract_cover_letter_drops_delimiters(response):
+    letter = ai_service._extract_cover_letter(response)
+    assert '<<<' not in letter
+    assert letter.replace('\r\n', '\n') == LETTER
+
+
+def test_extract_cover_letter_cleans_placeholders_without_delimiters():
+    response = f'[Your Name]\n[Your Address]\n\nDecember 9, 2025\n\n{LETTER}'
+    assert ai_service._extract_cover_letter(response) == LETTER
+
+
+def test_acall_coalesces_identical_requests_on_one_loop():
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'resume'
+
+    async def main():
+        return await asyncio.gather(ai_service._acall('same-key', generate),
+                                    ai_service._acall('same-key', generate))
+
+    assert asyncio.run(main()) == ['resume', 'resume']
+    assert len(calls) == 1
+
+
+def test_acall_identical_requests_on_separate_loops():
+    # Each worker thread runs its own event loop (asyncio.run), so the second
+    # request must not join a future that belongs to the first loop
+    started = threading.Event()
+    results, errors = [], []
+
+    async def generate():
+        started.set()
+        await asyncio.sleep(0.2)
+        return 'resume'
+
+    def worker():
+        try:
+            results.append(asyncio.run(ai_service._acall('same-key', generate)))
+        except Exception as e:
+            errors.append(e)
+
+    first = threading.Thread(target=worker)
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=worker)
+    second.start()
+    first.join()
+    second.join()
+
+    assert errors == []
+    assert results == ['resume', 'resume']
+    assert ai_service._inflight == {}
+
+
+class _FakeProvider:
+    resume_prompt = 'prompt'
+    cover_letter_prompt = 'prompt'
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+
+    def generate_tailored_resume(self, master_resume, job_description):
+        self.calls += 1
+        return f'{self.model}: {master_resume}'
+
+
+@pytest.fixture
+def ai_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('JASS_AI_CACHE', '1')
+    monkeypatch.setattr(ai_service, 'AI_CACHE_PATH', str(tmp_path / 'ai_cache'))
+    monkeypatch.setattr(ai_service, '_ai_memory_cache', ai_service.OrderedDict())
+    monkeypatch.setattr(ai_service, '_ai_cache_pruned', False)
+    return ai_service.AI_CACHE_PATH
+
+
+def test_tailor_resume_cache_key_includes_model(ai_cache, monkeypatch):
+    providers = {'m1': _FakeProvider('m1'), 'm2': _FakeProvider('m2')}
+    current = ['m1']
+    monkeypatch.setattr(ai_service, 'get_ai_provider',
+                        lambda provider=None, api_key=None: providers[current[0]])
+
+    assert ai_service.tailor_resume('resume', 'job') == 'm1: resume'
+    assert ai_service.tailor_resume('resume', 'job') == 'm1: resume'
+    current[0] = 'm2'
+    assert ai_service.tailor_resume('resume', 'job') == 'm2: resume'
+    assert providers['m1'].calls == 1
+    assert providers['m2'].calls == 1
+
+
+def test_cached_generate_deletes_expired_entries(ai_cache):
+    stale = time.time() - ai_service.AI_CACHE_TTL - 1
+    with shelve.open(ai_cache) as cache:
+        cache['old'] = (stale, 'old result')
+        cache['hit'] = (stale, 'stale result')
+
+    assert ai_service._cached_generate('hit', lambda: 'fresh result') == 'fresh result'
+    with shelve.open(ai_cache) as cache:
+        assert 'old' not in cache
+        assert cache['hit'][1] == 'fresh result'
+
+
+class _FakeAsyncClient:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class _AsyncProvider(ai_service.AIProvider):
+    def _make_aclient(self):
+        return _FakeAsyncClient()
+
+    def generate_tailored_resume(self, master_resume, job_description):
+        raise NotImplementedError
+
+    def generate_cover_letter(self, resume, job_description, company, job_title,
+                              hiring_manager=None):
+        raise NotImplementedError
+
+
+def test_aclient_per_loop_and_closed_at_loop_shutdown():
+    provider = _AsyncProvider()
+
+    async def get_clients():
+        return provider.aclient, provider.aclient
+
+    clients = []
+
+    def run():
+        clients.extend(asyncio.run(get_clients()))
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert clients[0] is clients[1] and clients[2] is clients[3]
+    assert clients[0] is not clients[2]
+    assert all(client.closed for client in clients)
+    assert not provider._aclients
+
+
+def test_rate_limiter_wait_blocks_until_window_has_room(monkeypatch):
+    now = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(ai_service.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(ai_service.time, 'sleep', sleep)
+    limiter = ai_service.RateLimiter(rpm=2, tpm=1000)
+    limiter.wait(100)
+    limiter.wait(100)
+    assert sleeps == []
+    limiter.wait(100)
+    assert sum(sleeps) == pytest.approx(limiter.WINDOW)
+
+
+class _Recorder:
+    def __init__(self):
+        self.tokens = []
+
+    def wait(self, tokens):
+        self.tokens.append(tokens)
+
+
+class _FakeMessages:
+    def create(self, **request):
+        text = type('Block', (), {'text': 'hello'})()
+        return type('Response', (), {'content': [text], 'usage': None})()
+
+
+def test_claude_sync_chat_uses_rate_limiter(monkeypatch):
+    limiter = _Recorder()
+    monkeypatch.setattr(ai_service, '_CLAUDE_LIMITER', limiter)
+    provider = ai_service.ClaudeProvider(api_key='sk-test')
+    provider.client = type('Client', (), {'messages': _FakeMessages()})()
+
+    assert provider.chat([{'role': 'user', 'content': 'x' * 400}]) == 'hello'
+    assert len(limiter.tokens) == 1 and limiter.tokens[0] >= 100
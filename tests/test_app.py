@@ -0,0 +1,148 @@
+"""Tests for the Flask routes."""
+from greenhouse import html_to_text
+from models import Job
+
+
+def _search_job(greenhouse_id, **fields):
+    job = {'greenhouse_id': greenhouse_id, 'board_token': 'acme', 'title': 'Engineer',
+           'company': 'Acme', 'description': '<p>Build things</p>'}
+    job.update(fields)
+    return job
+
+
+def test_save_bulk_saves_new_jobs_and_reports_existing(client, flask_app):
+    response = client.post('/search/save_bulk', json={'jobs': [_search_job('1')]})
+    assert response.status_code == 200
+    first_id = response.get_json()['job_ids']['1']
+
+    response = client.post('/search/save_bulk',
+                           json={'jobs': [_search_job('1'), _search_job('2', title='Designer')]})
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['saved'] == 1
+    assert data['job_ids']['1'] == first_id
+    with flask_app.app_context():
+        job = Job.query.filter_by(greenhouse_id='2').one()
+        assert (job.title, job.description_text, job.status) == ('Designer', 'Build things', 'saved')
+
+
+def test_save_bulk_rejects_jobs_missing_fields(client, flask_app):
+    jobs = [_search_job('1'), {'greenhouse_id': '2', 'title': 'Engineer'}, 'junk']
+    response = client.post('/search/save_bulk', json={'jobs': jobs})
+    assert response.status_code == 400
+    assert response.get_json()['invalid'] == [1, 2]
+    with flask_app.app_context():
+        assert Job.query.count() == 0
+
+
+def test_save_bulk_rejects_duplicate_greenhouse_ids(client, flask_app):
+    jobs = [_search_job('1'), _search_job('1', title='Other')]
+    response = client.post('/search/save_bulk', json={'jobs': jobs})
+    assert response.status_code == 400
+    assert response.get_json()['duplicates'] == ['1']
+    with flask_app.app_context():
+        assert Job.query.count() == 0
+
+
+def test_save_bulk_requires_jobs(client):
+    assert client.post('/search/save_bulk', json={'jobs': []}).status_code == 400
+
+
+ABOUT = 'Acme builds rockets for coyotes and has done so since 1949.'
+BENEFITS = 'We offer health insurance, a 401(k) match and unlimited anvils.'
+EEO = 'Acme is an equal opportunity employer and welcomes every applicant.'
+REQUIREMENTS = '5+ years of Python and PostgreSQL, on-site in Albuquerque, NM.'
+ROLE = 'You will design guidance systems for our next generation of rockets.'
+# Section markup as Greenhouse postings use it: h3 headings and bold paragraphs
+ABOUT_HTML = f'<h3>About Acme</h3><p>{ABOUT}</p>'
+BENEFITS_HTML = f'<p><strong>Benefits</strong></p><ul><li>{BENEFITS}</li></ul>'
+REQUIREMENTS_HTML = f'<h3>Requirements</h3><ul><li>{REQUIREMENTS}</li></ul>'
+
+
+def _add_postings(descriptions):
+    from models import db
+
+    jobs = [Job(greenhouse_id=f'gh{i}', board_token='acme', title='Engineer', company='Acme',
+                description=html, description_text=html_to_text(html))
+            for i, html in enumerate(descriptions)]
+    db.session.add_all(jobs)
+    db.session.commit()
+    return jobs
+
+
+def _resume_text(job_id):
+    """resume_description_text for a job loaded the way the tailor paths load it."""
+    from sqlalchemy import event
+
+    from app import TAILOR_JOB_OPTIONS, resume_description_text
+    from models import db
+
+    db.session.expunge_all()
+    job = db.session.get(Job, job_id, options=TAILOR_JOB_OPTIONS)
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        text = resume_description_text(job)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    # Only the other postings are queried; the description isn't lazy-loaded
+    assert len(statements) == 1
+    return text
+
+
+def test_resume_description_replaces_shared_boilerplate(client, flask_app):
+    from app import BOILERPLATE_MARKER
+
+    with flask_app.app_context():
+        *_, job = _add_postings(
+            [f'{ABOUT_HTML}<p>Role {i} is about something else entirely.</p>'
+             f'{BENEFITS_HTML}<p>{EEO}</p>' for i in range(3)]
+            + [f'{ABOUT_HTML}<p>{ROLE}</p>{BENEFITS_HTML}<p>{EEO}</p>'])
+        text = _resume_text(job.id)
+    assert ABOUT not in text and BENEFITS not in text and EEO not in text
+    assert ROLE in text
+    assert text.count(BOILERPLATE_MARKER) == 2
+
+
+def test_resume_description_keeps_shared_requirements(client, flask_app):
+    with flask_app.app_context():
+        *_, job = _add_postings([f'<p>{ROLE}</p>{REQUIREMENTS_HTML}'] * 4)
+        text = _resume_text(job.id)
+    assert REQUIREMENTS in text and ROLE in text
+
+
+def test_resume_description_needs_three_other_postings(client, flask_app):
+    with flask_app.app_context():
+        *_, job = _add_postings([ABOUT_HTML] * 2 + [f'{ABOUT_HTML}<p>{ROLE}</p>'])
+        assert _resume_text(job.id) == f'About Acme{ABOUT}{ROLE}'
+
+
+def test_resume_description_needs_half_of_sample(client, flask_app):
+    from app import BOILERPLATE_MARKER
+
+    other = '<p>A different posting with nothing in common at all.</p>'
+    with flask_app.app_context():
+        # 8 other postings: a block must be in 4 of them
+        *_, job = _add_postings([ABOUT_HTML] * 3 + [BENEFITS_HTML] * 4 + [other]
+                                + [f'{ABOUT_HTML}{BENEFITS_HTML}<p>{ROLE}</p>'])
+        assert _resume_text(job.id) == f'About Acme{ABOUT}Benefits{BOILERPLATE_MARKER}{ROLE}'
+
+
+def test_claude_models_from_cli(client, monkeypatch):
+    import subprocess
+
+    import app
+
+    calls = []
+
+    def run_claude(args, timeout=300, cwd=None, input_text=None):
+        calls.append(args)
+        return subprocess.CompletedProcess(
+            ['claude'] + args, 0, '| Model | ID |\n|---|---|\n| Claude Opus 4.6 | `claude-opus-4-6` |\n', '')
+
+    monkeypatch.setattr(app, 'run_claude', run_claude)
+    data = client.get('/settings/claude-models').get_json()
+    assert calls == [['-p', 'Show list of available models']]
+    assert data['source'] == 'cli'
+    assert data['models'] == [{'id': 'claude-opus-4-6', 'name': 'Claude Opus 4.6'}]
@@ -0,0 +1,41 @@
+"""Tests for Markdown and PDF rendering."""
+import pytest
+
+import document_gen
+from document_gen import generate_pdfs, markdown_to_html
+
+RESUME = '''<div style="text-align: center;">
+
+# Jane Doe
+jane.doe@example.com | (555) 123-4567
+
+</div>
+
+## Skills
+
+| Area | Tools |
+|------|-------|
+| Backend | Python, ~~Perl~~ |
+'''
+COVER_LETTER = 'Dear team,\n\nI would love to join.\n\nSincerely,\nJane Doe\n'
+
+
+def test_markdown_renders_inside_raw_html_header():
+    html = markdown_to_html(RESUME)
+    assert '<h1>Jane Doe</h1>' in html
+    assert '<a href="mailto:jane.doe@example.com">' in html
+    assert '<table>' in html and '<s>Perl</s>' in html
+
+
+def test_markdown_keeps_line_breaks():
+    assert 'Sincerely,<br />\nJane Doe' in markdown_to_html(COVER_LETTER)
+
+
+@pytest.mark.skipif(document_gen.HTML is None, reason='WeasyPrint system libraries missing')
+def test_generate_pdfs_renders_each_document(tmp_path):
+    resume_pdf, cover_pdf = tmp_path / 'resume.pdf', tmp_path / 'cover' / 'cover.pdf'
+    results = generate_pdfs([(RESUME, str(resume_pdf), 'resume'),
+                             (COVER_LETTER, str(cover_pdf), 'cover_letter')])
+    assert results == [True, True]
+    assert resume_pdf.read_bytes().startswith(b'%PDF')
+    assert cover_pdf.read_bytes().startswith(b'%PDF')
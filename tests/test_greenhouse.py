@@ -0,0 +1,29 @@
+"""Tests for the greenhouse HTML helpers."""
+import pytest
+
+from greenhouse import html_text_blocks, html_to_text
+
+
+@pytest.mark.parametrize('content', [
+    '<?xml version="1.0" encoding="utf-8"?><p>Café</p><ul><li>Python</li></ul>',
+    '<?xml version="1.0" encoding="iso-8859-1"?>\n<p>Café</p><ul><li>Python</li></ul>',
+])
+def test_html_helpers_accept_xml_encoding_declaration(content):
+    assert html_to_text(content, separator='\n') == 'Café\nPython'
+    assert html_text_blocks(content) == (('', 'Café'), ('', 'Python'))
+
+
+def test_html_helpers_handle_empty_and_plain_input():
+    assert html_to_text('') == ''
+    assert html_text_blocks('   ') == ()
+    assert html_to_text('plain text') == 'plain text'
+
+
+def test_html_text_blocks_track_section_headings():
+    content = ('<p>Intro</p><h3>About Us</h3><p>We make things.</p>'
+               '<p><strong>Benefits</strong></p><ul><li>Dental</li></ul>'
+               '<p><strong>Note:</strong> remote is fine.</p>')
+    assert html_text_blocks(content) == (
+        ('', 'Intro'), ('About Us', 'About Us'), ('About Us', 'We make things.'),
+        ('Benefits', 'Benefits'), ('Benefits', 'Dental'),
+        ('Benefits', 'Note: remote is fine.'))